@@ -1,10 +1,92 @@
 import typer
-import subprocess
+import requests
+import shutil
+import socket
+import threading
+import time
+from enum import Enum
+from functools import partial
 from pathlib import Path
-from typing import Optional
+from typing import Callable, List, Optional, Tuple
 
 app = typer.Typer(name="autosumm")
 
+def _check_module(module: str) -> str:
+    """Report line for an importable Python module."""
+    try:
+        __import__(module)
+        return f"   ✅ {module}"
+    except ImportError:
+        return f"   ❌ {module} - missing"
+
+def _check_binary(binary: str, label: str, install_hint: str) -> str:
+    """Report line for an external program found on PATH."""
+    # Look PATH up in-process, the same search `which` does, without starting a process per binary
+    if shutil.which(binary):
+        return f"   ✅ {label}"
+    return f"   ❌ {binary} - {install_hint}"
+
+def _skipped(name: str, reason: str="not enabled in config") -> str:
+    """Report line for a check that does not apply to this configuration or test profile."""
+    return f"   ⏭️  {name} (skipped, {reason})"
+
+# Checks `run --test` runs per profile: cheap makes no API requests (CI, config edits), standard probes every
+# API except the parser VLM, deep probes all of them
+class TestProfile(str, Enum):
+    cheap = "cheap"
+    standard = "standard"
+    deep = "deep"
+
+_API_TIMEOUT = (3, 10)  # (connect, read) seconds
+
+def _check_endpoint(name: str, base_url: str) -> str:
+    """Report line for a reachable API base URL. Any HTTP answer counts: no request is billed and the key is not sent."""
+    from .pipeline.client import shared_session
+    try:
+        response = shared_session(10).get(base_url, timeout=_API_TIMEOUT)
+        return f"   ✅ {name}: {base_url} reachable (HTTP {response.status_code}, API key not tested)"
+    except requests.RequestException as e:
+        return f"   ❌ {name}: {base_url} - unreachable: {e}"
+
+_SMTP_TIMEOUT = 3
+
+def _check_smtp(server: str, port: int) -> str:
+    """Report line for a reachable SMTP server; only connects, so no login attempt counts against the account."""
+    try:
+        with socket.create_connection((server, port), timeout=_SMTP_TIMEOUT) as sock:
+            # On the implicit-TLS port the greeting only comes after a handshake, so a connection is all we check
+            if port == 465:
+                return f"   ✅ {server}:{port} reachable (login not tested)"
+            greeting = sock.recv(512)
+        if greeting.startswith(b"220"):
+            return f"   ✅ {server}:{port} ready (login not tested)"
+        return f"   ❌ {server}:{port} - unexpected greeting: {greeting[:80]!r}"
+    except OSError as e:
+        return f"   ❌ {server}:{port} - unreachable: {e}"
+
+# Upper bound for the whole test-mode check run, however many checks there are
+_CHECKS_DEADLINE = 30
+
+def _run_checks(checks: List[Tuple[str, Callable[[], str]]]) -> List[str]:
+    """Run independent (name, check) pairs concurrently; results keep the order of checks so the report reads the same.
+    A check still running at the deadline is reported as timed out instead of holding up the report."""
+    results: List[Optional[str]] = [None] * len(checks)
+
+    def run_check(index: int, check: Callable[[], str]):
+        results[index] = check()
+
+    # Daemon threads: a check stuck past the deadline (e.g. in a DNS lookup) must not keep the command from exiting
+    threads = [threading.Thread(target=run_check, args=(i, check), daemon=True) for i, (_, check) in enumerate(checks)]
+    for thread in threads:
+        thread.start()
+    deadline = time.monotonic() + _CHECKS_DEADLINE
+    for thread in threads:
+        thread.join(max(0, deadline - time.monotonic()))
+    return [
+        result if result is not None else f"   ❌ {name} - timed out after {_CHECKS_DEADLINE}s"
+        for (name, _), result in zip(checks, results)
+    ]
+
 @app.command()
 def tune(
     config_path: Optional[str] = typer.Option(
@@ -43,6 +125,12 @@ def run(
         "--specify-category",
         "-s",
         help="Process only specified ArXiv category (single category only)"
+    ),
+    profile: TestProfile = typer.Option(
+        TestProfile.standard,
+        "--profile",
+        "-p",
+        help="Checks run with --test: cheap (no API probes), standard (all but the parser VLM) or deep (all)"
     )
 ):
     """
@@ -63,7 +151,7 @@ def run(
         if verbose:
             typer.echo("📝 Verbose mode enabled")
         if test_mode:
-            typer.echo("🧪 Test mode enabled - validating configuration only")
+            typer.echo(f"🧪 Test mode enabled - validating configuration only ({profile.value} profile)")
         if specified_category:
             # Validate that only one category is specified
             if ',' in specified_category:
@@ -80,39 +168,52 @@ def run(
                 config = MainConfig.from_yaml(config_file)
                 typer.echo("✅ Configuration loaded successfully")
 
-                # Test basic dependencies
-                import subprocess
-
-                # Check Python dependencies
-                typer.echo("📦 Checking Python dependencies...")
+                # All checks are independent, so run them together and report them grouped, in order
                 required_modules = ['arxiv', 'pydantic', 'requests', 'yaml']
-                for module in required_modules:
-                    try:
-                        __import__(module)
-                        typer.echo(f"   ✅ {module}")
-                    except ImportError:
-                        typer.echo(f"   ❌ {module} - missing")
-
-                # Check system dependencies if rendering PDF
-                if 'pdf' in config.render.formats:
-                    typer.echo("🖨️  Checking system dependencies...")
-                    try:
-                        result = subprocess.run(['which', 'xelatex'], capture_output=True, text=True, timeout=5)
-                        if result.returncode == 0:
-                            typer.echo("   ✅ xelatex (TeXLive)")
-                        else:
-                            typer.echo("   ❌ xelatex - install TeXLive")
-                    except (subprocess.TimeoutExpired, FileNotFoundError, subprocess.SubprocessError) as e:
-                        typer.echo(f"   ❌ xelatex - not found: {e}")
-
-                    try:
-                        result = subprocess.run(['which', 'pandoc'], capture_output=True, text=True, timeout=5)
-                        if result.returncode == 0:
-                            typer.echo("   ✅ pandoc")
-                        else:
-                            typer.echo("   ❌ pandoc - install pandoc")
-                    except (subprocess.TimeoutExpired, FileNotFoundError, subprocess.SubprocessError) as e:
-                        typer.echo(f"   ❌ pandoc - not found: {e}")
+                check_groups = [("📦 Checking Python dependencies...", [(module, partial(_check_module, module)) for module in required_modules])]
+                # Check system dependencies only for the formats that need them; the rest are listed as skipped
+                formats = set(config.render.formats)
+                calibre = config.render.azw3.calibre_path or 'ebook-convert'
+                system_checks = [
+                    ('xelatex', 'pdf' in formats, partial(_check_binary, 'xelatex', 'xelatex (TeXLive)', 'install TeXLive')),
+                    ('pandoc', bool(formats & {'pdf', 'html', 'azw3'}), partial(_check_binary, 'pandoc', 'pandoc', 'install pandoc')),
+                    ('ebook-convert', 'azw3' in formats, partial(_check_binary, calibre, 'ebook-convert (calibre)', 'install calibre')),
+                ]
+                if any(needed for _, needed, _ in system_checks):
+                    check_groups.append(("🖨️  Checking system dependencies...", [
+                        (name, check if needed else partial(_skipped, name)) for name, needed, check in system_checks
+                    ]))
+                # Every API the configured pipeline calls; probes to a shared host reuse one pooled connection
+                endpoints = [('summarizer', config.summarize.base_url)]
+                if config.rate.strategy in ('llm', 'hybrid') and config.rate.llm:
+                    endpoints.append(('rater llm', config.rate.llm.base_url))
+                if config.rate.strategy in ('embedder', 'hybrid') and config.rate.embedder:
+                    endpoints.append(('rater embedder', config.rate.embedder.base_url))
+                if config.parse.vlm:
+                    endpoints.append(('parser vlm', config.parse.vlm.base_url))
+                skipped_endpoints = []
+                if profile == TestProfile.cheap:
+                    endpoints, skipped_endpoints = [], endpoints
+                elif profile == TestProfile.standard:
+                    skipped_endpoints = [endpoint for endpoint in endpoints if endpoint[0] == 'parser vlm']
+                    endpoints = [endpoint for endpoint in endpoints if endpoint[0] != 'parser vlm']
+                # Components often share a provider; ping each base URL once and report it for all of them
+                users_by_url = {}
+                for name, base_url in endpoints:
+                    users_by_url.setdefault(base_url, []).append(name)
+                check_groups.append(("🌐 Checking API endpoints...", [
+                    (", ".join(names), partial(_check_endpoint, ", ".join(names), base_url)) for base_url, names in users_by_url.items()
+                ] + [
+                    (name, partial(_skipped, name, f"not in the {profile.value} profile")) for name, _ in skipped_endpoints
+                ]))
+                check_groups.append(("📧 Checking email delivery...", [
+                    ('smtp', partial(_check_smtp, config.deliver.smtp_server, config.deliver.port)),
+                ]))
+                results = iter(_run_checks([check for _, checks in check_groups for check in checks]))
+                for heading, checks in check_groups:
+                    typer.echo(heading)
+                    for _ in checks:
+                        typer.echo(next(results))
 
                 typer.echo("\n🎉 Configuration test completed!")
                 typer.echo("   Run without --test to execute the full pipeline")
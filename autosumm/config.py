@@ -280,6 +280,9 @@ class RaterEmbedderConfig(BaseModel):
     query_template: str="High-quality {user_interests} research paper with novel contributions, rigorous methodology, clear presentation and significant impact."
     user_interests: Optional[str]=None
     context_length: int=2048
+    cache_dir: Optional[str]="./cache/embeddings"
+    exact_chunk_tokens: bool=False
+    batch_size: int=64
 
     @model_validator(mode='after')
     def validate_api_config(self) -> 'RaterEmbedderConfig':
@@ -305,6 +308,11 @@ class RaterEmbedderConfig(BaseModel):
     @classmethod
     def validate_context_length(cls, v) -> int:
         return max(512,v)
+
+    @field_validator('batch_size')
+    @classmethod
+    def validate_batch_size(cls, v) -> int:
+        return max(1,v)
     
     def to_pipeline_config(self) -> 'RaterEmbedderConfig_':
         return RaterEmbedderConfig_(
@@ -314,7 +322,10 @@ class RaterEmbedderConfig(BaseModel):
             model=self.model,
             query_template=self.query_template,
             user_interests=self.user_interests,
-            context_length=self.context_length
+            context_length=self.context_length,
+            cache_dir=self.cache_dir,
+            exact_chunk_tokens=self.exact_chunk_tokens,
+            batch_size=self.batch_size
         )
 
 class RaterLLMConfig(BaseModel):
@@ -594,13 +605,20 @@ class BatchConfig(BaseModel):
     max_wait_hours: int=24
     poll_interval_seconds: int=30
     fallback_on_error: bool=True
+    max_concurrent: int=8
+
+    @field_validator('max_concurrent')
+    @classmethod
+    def validate_max_concurrent(cls, v) -> int:
+        return max(1, min(v, 64))
 
     def to_pipeline_config(self):
         return BatchConfig_(
             tmp_dir=self.tmp_dir,
             max_wait_hours=self.max_wait_hours,
             poll_interval_seconds=self.poll_interval_seconds,
-            fallback_on_error=self.fallback_on_error
+            fallback_on_error=self.fallback_on_error,
+            max_concurrent=self.max_concurrent
         )
 
 class CacherConfig(BaseModel):
@@ -699,6 +717,7 @@ class AZW3RendererConfig(BaseModel):
     language: str = "en"
     description: Optional[str] = None
     cover_image: Optional[str] = None
+    direct_markdown: bool = False
     
     def to_pipeline_config(self):
         return AZW3RendererConfig_(
@@ -707,23 +726,34 @@ class AZW3RendererConfig(BaseModel):
             title=self.title,
             language=self.language,
             description=self.description,
-            cover_image=self.cover_image
+            cover_image=self.cover_image,
+            direct_markdown=self.direct_markdown
         )
 
 class RendererConfig(BaseModel):
     formats: List[str]=["pdf","md"]
     output_dir: str
     base_filename: Optional[str]=None
+    pre_validate: bool=False
+    parallel_runtime: bool=False
     md: MarkdownRendererConfig=MarkdownRendererConfig()
     pdf: PDFRenderConfig=PDFRenderConfig()
     html: HTMLRendererConfig=HTMLRendererConfig()
     azw3: AZW3RendererConfig=AZW3RendererConfig()
 
+    @field_validator('formats')
+    @classmethod
+    def validate_formats(cls, v) -> List[str]:
+        """formats render concurrently, so a repeated format would race on the same output file"""
+        return list(dict.fromkeys(f.lower() for f in v))
+
     def to_pipeline_config(self):
         return RendererConfig_(
             formats=self.formats,
             output_dir=self.output_dir,
             base_filename=self.base_filename,
+            pre_validate=self.pre_validate,
+            parallel_runtime=self.parallel_runtime,
             md=self.md.to_pipeline_config() if self.md else MarkdownRendererConfig().to_pipeline_config(),
             pdf=self.pdf.to_pipeline_config() if self.pdf else PDFRenderConfig().to_pipeline_config(),
             html=self.html.to_pipeline_config() if self.html else HTMLRendererConfig().to_pipeline_config(),
@@ -809,6 +839,13 @@ class MainConfig(BaseModel):
             return cls._resolve_references(data)
         return data
 
+    @model_validator(mode="after")
+    def place_embedding_cache(self) -> 'MainConfig':
+        """Keep persisted embeddings under cache.dir, the directory that is kept between runs, unless set explicitly."""
+        if self.rate.embedder and 'cache_dir' not in self.rate.embedder.model_fields_set:
+            self.rate.embedder.cache_dir = os.path.join(self.cache.dir, "embeddings")
+        return self
+
     @classmethod
     def from_yaml(cls, path: str) -> 'MainConfig':
         with open(path, 'r', encoding='utf-8') as f:
@@ -13,7 +13,7 @@ from .pipeline import (
     Cacher, fetch_metadata, fetch_pdf,
     parse_vlm, parse_mistral, parse_mineru,
     rate_embed, rate_llm,
-    summarize, render, deliver
+    summarize, summary_cache_key, render, deliver
 )
 
 from .config import MainConfig, arxiv_categories
@@ -242,15 +242,35 @@ def summarize_paper(papers: List[PaperMetadata], cacher: Cacher, summarize_confi
         return []
     
     try:
-        parsed_contents = [paper.parsed_content for paper in papers]
-        summary_results = summarize(parsed_contents, summarize_config, batch_config)
+        papers_to_summarize = []
+        cache_keys = {}
+        for paper in papers:
+            cache_keys[paper.arxiv_id] = summary_cache_key(paper.parsed_content, summarize_config)
+            try:
+                cached_summary = cacher.get_summary(cache_keys[paper.arxiv_id])
+            except Exception as e:
+                logger.warning(f"Failed to read cached summary for {paper.arxiv_id}: {e}", exc_info=True)
+                cached_summary = None
+            if cached_summary is not None:
+                paper.summary = cached_summary
+            else:
+                papers_to_summarize.append(paper)
 
-        successful_summaries = 0
-        for paper, result in zip(papers, summary_results):
+        successful_summaries = len(papers) - len(papers_to_summarize)
+        logger.info(f"Found {successful_summaries} papers with cached summaries, {len(papers_to_summarize)} to summarize")
+
+        parsed_contents = [paper.parsed_content for paper in papers_to_summarize]
+        summary_results = summarize(parsed_contents, summarize_config, batch_config) if parsed_contents else []
+
+        for paper, result in zip(papers_to_summarize, summary_results):
             try:
                 if result.success:
                     paper.summary = result.content
                     successful_summaries += 1
+                    try:
+                        cacher.store_summary(cache_keys[paper.arxiv_id], result.content)
+                    except Exception as e:
+                        logger.warning(f"Failed to cache summary for {paper.arxiv_id}: {e}", exc_info=True)
                     if verbose:
                         logger.debug(f"summarize for {paper.arxiv_id} succeeded: {len(result.content)} tokens")
                 else:
@@ -288,7 +308,7 @@ def setup_logging(log_dir: str, send_log: bool, verbose: bool = False):
 
     if send_log:
         os.makedirs(log_dir, exist_ok=True)
-        log_file_path = os.path.join(log_dir, f"run-{date.today().isoformat()}-{datetime.now().strftime('%H')}.txt")
+        log_file_path = os.path.join(log_dir, f"run-{datetime.now().strftime('%Y-%m-%d-%H')}.txt")
         file_handler = logging.FileHandler(log_file_path)
         file_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
         handlers.append(file_handler)
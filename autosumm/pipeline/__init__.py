@@ -4,7 +4,7 @@ from .fetch import fetch_metadata, fetch_pdf, FetcherConfig, FetchResult
 from .parse import parse_vlm, parse_mineru, parse_mistral, ParserConfig, ParseResult, ParserVLMConfig, MistralOCRConfig, MinerUConfig
 from .rate import rate_embed, rate_llm, RaterConfig, RateResult, RaterEmbedderConfig, RaterLLMConfig, RaterEmbedderClient
 from .render import render, MarkdownRendererConfig, PDFRendererConfig, HTMLRendererConfig, AZW3RendererConfig, RendererConfig, RenderResult
-from .summarize import summarize, SummarizerConfig, SummaryResult
+from .summarize import summarize, summary_cache_key, SummarizerConfig, SummaryResult
 from .client import BaseClient, BatchConfig
 
 __all__ = [name for name in globals() if not name.startswith('__')]
@@ -1,6 +1,6 @@
 """
 SQLite-based caching system for ArXiv summarization pipeline.
-Caches similarity scores, rating scores, and tracks delivered papers.
+Caches similarity scores, rating scores, summaries, and tracks delivered papers.
 Handles config change detection and automatic cache invalidation.
 """
 
@@ -66,6 +66,15 @@ class Cacher:
             )
         ''')
         
+        # Summaries from LLM, keyed by a hash of paper content and summarizer settings
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS summaries (
+                content_hash TEXT PRIMARY KEY,
+                summary TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
         # Delivered papers tracking
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS delivered_papers (
@@ -179,6 +188,40 @@ class Cacher:
         conn.close()
         logger.debug(f"Stored rating score for {arxiv_id}: {score}")
     
+    # Summaries (from LLM summarizer)
+    def get_summary(self, content_hash: str) -> Optional[str]:
+        """Get cached summary for a paper content hash."""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute(
+            'SELECT summary FROM summaries WHERE content_hash = ?',
+            (content_hash,)
+        )
+        result = cursor.fetchone()
+        conn.close()
+        
+        if result:
+            logger.info(f"Cache hit: summary for content hash {content_hash[:12]}")
+            return result[0]
+        else:
+            logger.debug(f"Cache miss: no summary for content hash {content_hash[:12]}")
+            return None
+    
+    def store_summary(self, content_hash: str, summary: str):
+        """Store summary for a paper content hash."""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute(
+            'INSERT OR REPLACE INTO summaries (content_hash, summary) VALUES (?, ?)',
+            (content_hash, summary)
+        )
+        
+        conn.commit()
+        conn.close()
+        logger.debug(f"Stored summary for content hash {content_hash[:12]}")
+    
     # Delivered papers tracking
     def is_paper_delivered(self, arxiv_id: str) -> bool:
         """Check if paper has been delivered."""
@@ -231,7 +274,7 @@ class Cacher:
             if last_hash is None:
                 logger.info("First run - no cache clearing needed")
             else:
-                logger.info("Configuration changed - clearing all caches except delivered papers")
+                logger.info("Configuration changed - clearing all caches except delivered papers and summaries")
                 self.clear_all_cache(preserve_delivered_papers=True)
             
             cursor.execute(
@@ -264,11 +307,25 @@ class Cacher:
         conn.close()
         logger.info(f"Cleared rater cache (rating scores) - deleted {deleted} entries")
     
-    def clear_all_cache(self, preserve_delivered_papers: bool = True):
-        """Clear all caches, optionally preserving delivered papers tracking."""
+    def clear_summary_cache(self):
+        """Clear cached summaries."""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('DELETE FROM summaries')
+        deleted = cursor.rowcount
+        conn.commit()
+        conn.close()
+        logger.info(f"Cleared summary cache - deleted {deleted} entries")
+    
+    def clear_all_cache(self, preserve_delivered_papers: bool = True, include_summaries: bool = False):
+        """Clear all caches, optionally preserving delivered papers tracking.
+        Summaries are kept unless include_summaries is set: their keys already cover every summarizer setting,
+        so a config change never serves a stale summary and should not throw the paid-for ones away."""
         logger.info("Clearing all caches...")
         self.clear_embedder_cache()
         self.clear_rater_cache()
+        if include_summaries:
+            self.clear_summary_cache()
 
         if not preserve_delivered_papers:
             conn = sqlite3.connect(self.db_path)
@@ -288,7 +345,7 @@ class Cacher:
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
         
-        tables = ['similarity_scores', 'rating_scores', 'delivered_papers']
+        tables = ['similarity_scores', 'rating_scores', 'summaries', 'delivered_papers']
         total_deleted = 0
         
         for table in tables:
@@ -316,7 +373,7 @@ class Cacher:
         stats = {}
         
         # Count records in each table
-        tables = ['similarity_scores', 'rating_scores', 'delivered_papers']
+        tables = ['similarity_scores', 'rating_scores', 'summaries', 'delivered_papers']
         for table in tables:
             cursor.execute(f'SELECT COUNT(*) FROM {table}')
             stats[f'{table}_count'] = cursor.fetchone()[0]
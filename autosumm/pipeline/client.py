@@ -3,23 +3,40 @@ Reusable base client object for ParserVLMClient, RaterLLMClient and SummarizerLL
 """
 
 import json
+import os
+import random
 import time
 import requests
+from requests.adapters import HTTPAdapter
 import tiktoken
 import logging
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 from abc import ABC, abstractmethod
 from pathlib import Path
 from typing import List, Dict, Any, Optional, Union
 from dataclasses import dataclass
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+def json_loads(data: Union[str, bytes]) -> Any:
+    """Decode JSON with orjson when installed, falling back to the standard library."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
 @dataclass
 class BatchConfig:
     tmp_dir: str = "./tmp"
     max_wait_hours: int = 24
     poll_interval_seconds: int = 30
     fallback_on_error: bool = True
+    max_concurrent: int = 8
 
 @dataclass
 class UsageInfo:
@@ -42,10 +59,36 @@ class UsageInfo:
         """Calculate total tokens from prompt and completion tokens"""
         self.total_tokens = self.prompt_tokens + self.completion_tokens
 
+class TimeoutSession(requests.Session):
+    """Session that applies default_timeout to every request that does not set its own.
+    requests has no session-wide timeout, so without this a stalled server hangs a request forever."""
+    # (connect, read) seconds; the read timeout is the longest silence between bytes, not the total time,
+    # and a non-streaming completion stays silent until the whole answer is generated
+    default_timeout = (10, 600)
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault('timeout', self.default_timeout)
+        return super().request(method, url, **kwargs)
+
+@lru_cache(maxsize=None)
+def shared_session(pool_size: int) -> requests.Session:
+    """Pooled session shared by every client of a process, so clients talking to the same host
+    (e.g. rater and summarizer on one provider, or a VLM client made per paper) reuse its connections."""
+    session = TimeoutSession()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+# Seconds to wait before each retry of a throttled request, plus jitter
+_THROTTLE_BACKOFF = (5, 15, 45)
+
 class BaseClient(ABC):
     def __init__(self, config, batch_config: Optional[BatchConfig]=None):
         self.config = config
         self.batch_config = batch_config or BatchConfig()
+        # Keep connections alive across requests and across clients; credentials go in per-request headers
+        self.session = shared_session(max(self.batch_config.max_concurrent, 10))
 
     @abstractmethod
     def _build_payload(self, input_data: Any) -> dict:
@@ -124,7 +167,9 @@ class BaseClient(ABC):
         headers = self._get_headers()
         endpoint = self._get_endpoint_url()
 
-        response = requests.post(endpoint, headers=headers, json=payload)
+        # Read streamed bodies incrementally so handlers can stop as soon as the answer is complete
+        is_streaming = payload.get("stream", False)
+        response = self._post_with_backoff(endpoint, headers, payload, stream=is_streaming)
 
         try:
             response.raise_for_status()
@@ -134,12 +179,34 @@ class BaseClient(ABC):
             logger.error(f"Response text: {response.text}")
             raise
 
-        if self._is_ollama_provider():
-            return self._handle_ollama_response(response, payload.get("stream", False))
-        elif self._is_anthropic_provider():
-            return self._handle_anthropic_response(response, payload.get("stream", False))
-        else:
-            return self._handle_openai_response(response, payload.get("stream", False))
+        try:
+            if self._is_ollama_provider():
+                return self._handle_ollama_response(response, is_streaming)
+            elif self._is_anthropic_provider():
+                return self._handle_anthropic_response(response, is_streaming)
+            else:
+                return self._handle_openai_response(response, is_streaming)
+        finally:
+            response.close()
+
+    def _post_with_backoff(self, endpoint: str, headers: dict, payload: dict, stream: bool=False) -> requests.Response:
+        """POST, waiting and retrying while the provider throttles (HTTP 429), so concurrent requests to a
+        rate-limited provider are delayed rather than lost. Honors Retry-After when given in seconds."""
+        for delay in (*_THROTTLE_BACKOFF, None):
+            response = self.session.post(endpoint, headers=headers, json=payload, stream=stream)
+            if response.status_code != 429 or delay is None:
+                return response
+            retry_after = response.headers.get("Retry-After", "")
+            wait = float(retry_after) if retry_after.isdigit() else delay * random.uniform(1, 1.5)
+            response.close()
+            logger.warning(f"{self.config.provider} is throttling requests (HTTP 429), retrying in {wait:.1f}s")
+            time.sleep(wait)
+
+    def _stream_complete(self, partial_response: str) -> bool:
+        """Whether a streamed response already holds everything the caller needs.
+        Subclasses can override this to ignore any text generated afterwards. The stream is still
+        read to its end, because providers report token usage in the final chunk."""
+        return False
 
     @abstractmethod
     def _parse_response(self, response_content: str) -> Any:
@@ -169,12 +236,14 @@ class BaseClient(ABC):
 
         if is_streaming:
             full_response = ""
+            complete = False
             for line in response.iter_lines():
                 if line:
                     try:
                         chunk = json.loads(line.decode('utf-8'))
-                        if chunk.get('message', {}).get('content'):
+                        if chunk.get('message', {}).get('content') and not complete:
                             full_response += chunk['message']['content']
+                            complete = self._stream_complete(full_response)
                         # Extract usage from final streaming chunk
                         if chunk.get('done', False):
                             usage_info.prompt_tokens = chunk.get('prompt_eval_count', 0)
@@ -198,6 +267,7 @@ class BaseClient(ABC):
 
         if is_streaming:
             full_response = ""
+            complete = False
             for line in response.iter_lines():
                 if line:
                     line = line.decode('utf-8')
@@ -205,8 +275,9 @@ class BaseClient(ABC):
                         try:
                             chunk = json.loads(line[6:])  # Remove 'data: ' prefix
                             if chunk.get('type') == 'content_block_delta':
-                                if chunk.get('delta', {}).get('text'):
+                                if chunk.get('delta', {}).get('text') and not complete:
                                     full_response += chunk['delta']['text']
+                                    complete = self._stream_complete(full_response)
                             # Extract usage from streaming response
                             elif chunk.get('type') == 'message_start':
                                 if chunk.get('message', {}).get('usage'):
@@ -237,6 +308,7 @@ class BaseClient(ABC):
 
         if is_streaming:
             full_response = ""
+            complete = False
             for line in response.iter_lines():
                 if line:
                     line = line.decode('utf-8')
@@ -245,8 +317,10 @@ class BaseClient(ABC):
                             break
                         try:
                             chunk = json.loads(line[6:])  # Remove 'data: ' prefix
-                            if chunk.get('choices', [{}])[0].get('delta', {}).get('content'):
+                            # The usage chunk that include_usage asks for has an empty choices list
+                            if (chunk.get('choices') or [{}])[0].get('delta', {}).get('content') and not complete:
                                 full_response += chunk['choices'][0]['delta']['content']
+                                complete = self._stream_complete(full_response)
                             # Extract usage from streaming response
                             if chunk.get('usage'):
                                 usage_data = chunk['usage']
@@ -295,7 +369,7 @@ class BaseClient(ABC):
         # Upload file
         files_endpoint = f"{self.config.base_url.rstrip('/')}/files"
         with open(jsonl_path, 'rb') as f:
-            files_response = requests.post(
+            files_response = self.session.post(
                 files_endpoint,
                 headers={"Authorization": headers.get("Authorization", "")},
                 files={"file": f},
@@ -312,7 +386,7 @@ class BaseClient(ABC):
             "completion_window": "24h"
         }
         
-        batch_response = requests.post(batch_endpoint, headers=headers, json=batch_payload)
+        batch_response = self.session.post(batch_endpoint, headers=headers, json=batch_payload)
         batch_response.raise_for_status()
         
         return batch_response.json()["id"]
@@ -325,7 +399,7 @@ class BaseClient(ABC):
         max_polls = (self.batch_config.max_wait_hours * 3600) // self.batch_config.poll_interval_seconds
         
         for _ in range(max_polls):
-            response = requests.get(batch_endpoint, headers=headers)
+            response = self.session.get(batch_endpoint, headers=headers)
             response.raise_for_status()
             batch_info = response.json()
             
@@ -350,35 +424,34 @@ class BaseClient(ABC):
         headers = self._get_headers()
         download_endpoint = f"{self.config.base_url.rstrip('/')}/files/{output_file_id}/content"
         
-        response = requests.get(download_endpoint, headers=headers)
+        response = self.session.get(download_endpoint, headers=headers)
         response.raise_for_status()
         
         # Save to file
         with open(output_path, 'wb') as f:
             f.write(response.content)
         
-        # Parse results
+        # Parse results from the downloaded bytes rather than reading the file back
         results = {}  # custom_id -> response content
-        with open(output_path, 'r', encoding='utf-8') as f:
-            for line in f:
-                try:
-                    result_item = json.loads(line.strip())
-                    custom_id = result_item["custom_id"]
-                    
-                    if "error" in result_item:
+        for line in response.content.splitlines():
+            try:
+                result_item = json_loads(line.strip())
+                custom_id = result_item["custom_id"]
+                
+                if "error" in result_item:
+                    results[custom_id] = None
+                else:
+                    response_body = result_item["response"]["body"]
+                    if "error" in response_body:
+                        logger.error(f"Batch item {custom_id} API error: {response_body['error']}")
                         results[custom_id] = None
                     else:
-                        response_body = result_item["response"]["body"]
-                        if "error" in response_body:
-                            logger.error(f"Batch item {custom_id} API error: {response_body['error']}")
-                            results[custom_id] = None
-                        else:
-                            content = response_body["choices"][0]["message"]["content"]
-                            results[custom_id] = content
-                        
-                except (json.JSONDecodeError, KeyError) as e:
-                    logger.warning(f"Failed to parse result line: {e}")
-                    continue
+                        content = response_body["choices"][0]["message"]["content"]
+                        results[custom_id] = content
+                    
+            except (json.JSONDecodeError, KeyError) as e:
+                logger.warning(f"Failed to parse result line: {e}")
+                continue
         
         # Return results in original order
         ordered_results = []
@@ -401,14 +474,11 @@ class BaseClient(ABC):
         
         logger.info(f"Retrying {len(failed_indices)} failed items individually...")
 
-        for idx in failed_indices:
-            try:
-                individual_result = self.process_single(input_data_list[idx], return_usage=False)
-                final_results[idx] = individual_result
-                if individual_result is not None:
-                    logger.info(f"Successfully recovered item {idx} via individual processing")
-            except Exception as e:
-                logger.error(f"Individual retry failed for item {idx}: {e}")
+        retried = self.process_concurrent([input_data_list[idx] for idx in failed_indices])
+        for idx, individual_result in zip(failed_indices, retried):
+            final_results[idx] = individual_result
+            if individual_result is not None:
+                logger.info(f"Successfully recovered item {idx} via individual processing")
 
         return final_results
     
@@ -419,12 +489,12 @@ class BaseClient(ABC):
         """
         if self._is_ollama_provider():
             if self.batch_config.fallback_on_error:
-                return [self.process_single(input_data) for input_data in input_data_list]
+                return self.process_concurrent(input_data_list)
             else:
                 raise ValueError("Batch processing not supported for Ollama provider")
         elif self._is_anthropic_provider():
             if self.batch_config.fallback_on_error:
-                return [self.process_single(input_data) for input_data in input_data_list]
+                return self.process_concurrent(input_data_list)
             else:
                 raise ValueError("Batch processing not supported for Anthropic provider")
             
@@ -470,20 +540,71 @@ class BaseClient(ABC):
             else:
                 return None
 
+    def process_concurrent(self, input_data_list: List[Any], return_usage: bool=False) -> List[Any]:
+        """Process inputs as individual requests issued concurrently, bounded by batch_config.max_concurrent.
+        Returns results (or (result, usage) tuples) in the same order as inputs."""
+        if not input_data_list:
+            return []
+        max_workers = min(self.batch_config.max_concurrent, len(input_data_list))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(self._process_one, input_data, return_usage) for input_data in input_data_list]
+            return [future.result() for future in futures]
+
+    def _process_one(self, input_data: Any, return_usage: bool) -> Any:
+        try:
+            return self.process_single(input_data, return_usage=return_usage)
+        except Exception as e:
+            logger.error(f"Failed to process input: {e}",exc_info=True)
+            return (None, None) if return_usage else None
+
     def _process_single_with_usage(self, input_data: Any, sleep_time: float=0) -> tuple[Optional[str], Optional[UsageInfo]]:
         """Internal method that always returns usage info - for new code that expects it"""
         return self.process_single(input_data, sleep_time, return_usage=True)
 
+@lru_cache(maxsize=None)
+def _get_encoding() -> tiktoken.Encoding:
+    return tiktoken.get_encoding("cl100k_base")
+
+# Longer texts (whole papers) are counted without caching: they are never counted twice, and as cache
+# keys they would stay in memory for the life of the process
+_CACHED_COUNT_MAX_CHARS = 4096
+
+# Sentences repeat across papers (citations, boilerplate), so keep plenty of entries
+@lru_cache(maxsize=100_000)
+def _count_tokens_cached(text: str) -> int:
+    return len(_get_encoding().encode(text,disallowed_special=()))
+
 def count_tokens(text: str) -> int:
-    encoding = tiktoken.get_encoding("cl100k_base")
-    return len(encoding.encode(text,disallowed_special=()))
+    if len(text) <= _CACHED_COUNT_MAX_CHARS:
+        return _count_tokens_cached(text)
+    return len(_get_encoding().encode(text,disallowed_special=()))
+
+def fits_in_tokens(text: str, max_tokens: int) -> bool:
+    """Whether text certainly has at most max_tokens tokens, decided without running the tokenizer.
+    cl100k_base is byte-level BPE, so every token covers at least one UTF-8 byte."""
+    return len(text) <= max_tokens and len(text.encode('utf-8')) <= max_tokens
 
 def truncate_to_tokens(text: str, max_tokens: int) -> str:
     """Truncate text"""
-    encoding = tiktoken.get_encoding("cl100k_base")
+    if fits_in_tokens(text, max_tokens):
+        return text
+    encoding = _get_encoding()
     tokens = encoding.encode(text, disallowed_special=())
     if len(tokens) <= max_tokens:
         return text
     
     truncated_tokens = tokens[:max_tokens]
-    return encoding.decode(truncated_tokens)
\ No newline at end of file
+    return encoding.decode(truncated_tokens)
+
+def truncate_to_tokens_batch(texts: List[str], max_tokens: int) -> List[str]:
+    """truncate_to_tokens for many texts, encoding the ones that may not fit in a single threaded tiktoken call."""
+    results = list(texts)
+    pending = [i for i, text in enumerate(texts) if not fits_in_tokens(text, max_tokens)]
+    if not pending:
+        return results
+    encoding = _get_encoding()
+    encoded = encoding.encode_batch([texts[i] for i in pending], num_threads=os.cpu_count() or 1, disallowed_special=())
+    for i, tokens in zip(pending, encoded):
+        if len(tokens) > max_tokens:
+            results[i] = encoding.decode(tokens[:max_tokens])
+    return results
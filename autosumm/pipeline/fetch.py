@@ -22,6 +22,9 @@ from pdfminer.layout import LAParams
 
 logger = logging.getLogger(__name__)
 
+# Single line breaks inside paragraphs, left over from page layout
+_LONE_NEWLINE = re.compile(r'(?<!\n)\n(?!\n)')
+
 @dataclass
 class FetcherConfig:
     days: int=8
@@ -122,7 +125,7 @@ def _extract_text_from_bytes(pdf_bytes: bytes) -> str:
         content = extract_text(pdf_stream, laparams=LAParams())
 
     # Remove inappropriate line breaks within paragraphs to form coherent sentences
-    content = re.sub(r'(?<!\n)\n(?!\n)', ' ', content)
+    content = _LONE_NEWLINE.sub(' ', content)
     return content.strip()
 
 def _extract_from_cached_file(cache_path: Path, pdf_url: str, index: int) -> FetchResult:
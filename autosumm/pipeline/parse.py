@@ -23,6 +23,11 @@ except:
 
 logger = logging.getLogger(__name__)
 
+# Single line breaks inside paragraphs, left over from page layout
+_LONE_NEWLINE = re.compile(r'(?<!\n)\n(?!\n)')
+# Mistral OCR image placeholder, e.g. ![img-0.jpeg](img-0.jpeg)
+_IMAGE_PLACEHOLDER = re.compile(r'!\[.*?\]\(.*?\)')
+
 @dataclass
 class ParserVLMConfig:
     provider: Optional[str]
@@ -151,7 +156,7 @@ def _construct_results_vlm(vlm_results: List[Optional[str]], pdf_image_counts: L
         page_contents = [result for result in pdf_vlm_results if result]
         full_content = "\n\n".join(page_contents)
         # Remove inappropriate line breaks within paragraphs to form coherent sentences
-        full_content = re.sub(r'(?<!\n)\n(?!\n)', ' ', full_content)
+        full_content = _LONE_NEWLINE.sub(' ', full_content)
 
         results.append(ParseResult(
             content=full_content,
@@ -336,10 +341,8 @@ def _construct_markdown_mistral(ocr_result: str, config: ParserConfig):
 
             # Replace image placeholder with captioned version
             # "![img-0.jpeg](img-0.jpeg)" -> ![{caption}](img-1.jpeg)
-            image_pattern = r'!\[.*?\]\(.*?\)'
-            if re.search(image_pattern, markdown_page):
-                markdown_page = re.sub(image_pattern, f"![{vlm_caption}](img-{img_counter}.jpeg)", markdown_page, count=1)
-            else: # no image placeholder found, add at the end
+            markdown_page, replaced = _IMAGE_PLACEHOLDER.subn(f"![{vlm_caption}](img-{img_counter}.jpeg)", markdown_page, count=1)
+            if not replaced: # no image placeholder found, add at the end
                 markdown_page += f"\n\n![{vlm_caption}](img-{img_counter}.jpeg)"
 
             img_counter += 1
@@ -349,7 +352,7 @@ def _construct_markdown_mistral(ocr_result: str, config: ParserConfig):
 
     markdown_content = "\n\n".join(markdown_pages)
     # Remove inappropriate line breaks within paragraphs to form coherent sentences
-    markdown_content = re.sub(r'(?<!\n)\n(?!\n)', ' ', markdown_content)
+    markdown_content = _LONE_NEWLINE.sub(' ', markdown_content)
     return markdown_content
 
 def parse_mistral(cache_paths: List[str], config: ParserConfig) -> List[ParseResult]:
@@ -500,7 +503,7 @@ def _construct_markdown_mineru(zip_url, config: ParserConfig):
 
     markdown_content = "\n\n".join(markdown_pages)
     # Remove inappropriate line breaks within paragraphs to form coherent sentences
-    markdown_content = re.sub(r'(?<!\n)\n(?!\n)', ' ', markdown_content)
+    markdown_content = _LONE_NEWLINE.sub(' ', markdown_content)
     return markdown_content
 
 def parse_mineru(cache_paths: List[str], config: ParserConfig) -> List[ParseResult]:
@@ -5,18 +5,39 @@ Rate fetched papers with a coarse-to-fine strategy.
 import numpy as np
 import requests
 import json
+import hashlib
+import math
+import re
+import sqlite3
+from contextlib import closing
+from pathlib import Path
 from dataclasses import dataclass
-from typing import List, Optional, Dict, Union, Tuple, Any
+from typing import List, Optional, Dict, Union, Tuple, Any, Iterator
 from json_repair import repair_json
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
 
 try:
-    from client import BaseClient, BatchConfig, UsageInfo, count_tokens, truncate_to_tokens
+    import simsimd
+except ImportError:
+    simsimd = None
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+try:
+    from client import BaseClient, BatchConfig, UsageInfo, count_tokens, fits_in_tokens, truncate_to_tokens, json_loads
 except:
-    from .client import BaseClient, BatchConfig, UsageInfo, count_tokens, truncate_to_tokens
+    from .client import BaseClient, BatchConfig, UsageInfo, count_tokens, fits_in_tokens, truncate_to_tokens, json_loads
 
 logger = logging.getLogger(__name__)
 
+# Chunk embeddings are kept and cached at half precision; cosine similarity is computed in float32
+EMBEDDING_DTYPE = np.float16
+
 @dataclass
 class RaterEmbedderConfig:
     provider: Optional[str]
@@ -26,6 +47,9 @@ class RaterEmbedderConfig:
     query_template: str="High-quality {user_interests} research paper with novel contributions, rigorous methodology, clear presentation and significant impact."
     user_interests: Optional[str]=None
     context_length: int=2048
+    cache_dir: Optional[str]="./cache/embeddings" # If None, embeddings are not persisted between runs
+    exact_chunk_tokens: bool=False # If False, sentence token counts are estimated from a sample when chunking
+    batch_size: int=64 # Texts per embedding request for endpoints that accept list input; some providers cap it far lower
 
 @dataclass
 class RaterLLMConfig:
@@ -55,9 +79,10 @@ class RateResult:
     error: Optional[str]
     method: str="embed"
 
-def cosine_similarity(a: List[float], b: List[float]) -> float:
-    a = np.array(a)
-    b = np.array(b)
+def cosine_similarity(a: Union[List[float], np.ndarray], b: Union[List[float], np.ndarray]) -> float:
+    # float32 is all the precision embedding APIs deliver, and halves memory traffic
+    a = np.asarray(a, dtype=np.float32)
+    b = np.asarray(b, dtype=np.float32)
 
     dot_product = np.dot(a,b)
     a_norm = np.linalg.norm(a)
@@ -66,52 +91,195 @@ def cosine_similarity(a: List[float], b: List[float]) -> float:
     if a_norm == 0 or b_norm == 0:
         return 0.0
     
-    return dot_product / (a_norm * b_norm)
-
-def chunk_text(text: str, max_tokens: int) -> List[Tuple[str, int]]:
-    """Split text into chunks that fit within token limit."""
-    sentences = text.split('. ')
-    chunks = []
-    current_chunk = ""
+    return float(dot_product / (a_norm * b_norm))
+
+if numba is not None:
+    @numba.njit(parallel=True, fastmath=True, cache=True)
+    def _cosine_kernel(matrix, query_unit):
+        n, d = matrix.shape
+        out = np.empty(n, dtype=np.float32)
+        for i in numba.prange(n):
+            dot = 0.0
+            norm = 0.0
+            for j in range(d):
+                dot += matrix[i, j] * query_unit[j]
+                norm += matrix[i, j] * matrix[i, j]
+            out[i] = dot / (np.sqrt(norm) + 1e-12)
+        return out
+else:
+    _cosine_kernel = None
+
+def cosine_similarities(query_unit: np.ndarray, embeddings: List[np.ndarray]) -> np.ndarray:
+    """Cosine similarity of every embedding against an already L2-normalized query.
+
+    Uses SimSIMD's fused SIMD cosine kernel when installed, then a parallel Numba kernel,
+    otherwise a single NumPy matmul.
+    """
+    matrix = np.ascontiguousarray(embeddings, dtype=np.float32)
+    if simsimd is not None:
+        query = np.ascontiguousarray(query_unit, dtype=np.float32)[None, :]
+        distances = np.asarray(simsimd.cdist(matrix, query, metric="cosine"), dtype=np.float32)
+        return 1.0 - distances[:, 0]
+    if _cosine_kernel is not None:
+        return _cosine_kernel(matrix, np.ascontiguousarray(query_unit, dtype=np.float32))
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    matrix /= np.clip(norms, 1e-12, None)
+    return matrix @ query_unit
+
+# Sentence boundary: whitespace following terminal punctuation, which stays with its sentence
+_SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])\s+')
+
+# Markdown code fences around LLM JSON output (including the common "jons" typo)
+_CODE_FENCE = re.compile(r'^\s*```(?:json|jons)?\s*|\s*```\s*$', re.IGNORECASE)
+
+def estimate_token_counts(sentences: List[str], sample_head: int=5, sample_every: int=50) -> List[int]:
+    """Estimate per-sentence token counts from a tokenized sample.
+
+    The first `sample_head` and every `sample_every`-th sentence are tokenized exactly; the rest
+    are estimated from their character length using the tokens-per-character ratio of the sample.
+    """
+    sampled = {i for i in range(min(sample_head, len(sentences)))}
+    sampled.update(range(0, len(sentences), sample_every))
+    exact = {i: count_tokens(sentences[i]) for i in sampled}
+    sampled_chars = sum(len(sentences[i]) for i in sampled)
+    ratio = sum(exact.values()) / sampled_chars if sampled_chars > 0 else 0.25
+    return [exact[i] if i in exact else max(1, math.ceil(ratio * len(sentence))) for i, sentence in enumerate(sentences)]
+
+def iter_chunks(text: str, max_tokens: int, exact: bool=True) -> Iterator[Tuple[str, int]]:
+    """Yield (chunk, token_count) pairs that fit within token limit.
+
+    With exact=False, sentence token counts are estimated and chunks are packed to 90% of
+    max_tokens to leave headroom for estimation error.
+    """
+    sentences = [sentence for sentence in _SENTENCE_BOUNDARY.split(text) if sentence]
+    if exact:
+        sentence_counts = [count_tokens(sentence) for sentence in sentences]
+    else:
+        sentence_counts = estimate_token_counts(sentences)
+        max_tokens = int(max_tokens * 0.9)
+    # Sentences are buffered and joined once per chunk rather than concatenated one by one
+    buffer = []
     current_tokens = 0
     
-    for sentence in sentences:
-        sentence_tokens = count_tokens(sentence)
+    for sentence, sentence_tokens in zip(sentences, sentence_counts):
         
         # If single sentence exceeds limit, truncate it
         if sentence_tokens > max_tokens:
-            truncated = truncate_to_tokens(sentence, max_tokens)
-            if current_chunk:
-                chunks.append((current_chunk.strip(), current_tokens))
-            chunks.append((truncated, max_tokens))
-            current_chunk = ""
+            if buffer:
+                yield " ".join(buffer).strip(), current_tokens
+            yield truncate_to_tokens(sentence, max_tokens), max_tokens
+            buffer = []
             current_tokens = 0
             continue
         
         # If adding this sentence would exceed limit, start new chunk
         if current_tokens + sentence_tokens > max_tokens:
-            if current_chunk:
-                chunks.append((current_chunk.strip(), current_tokens))
-            current_chunk = sentence
+            if buffer:
+                yield " ".join(buffer).strip(), current_tokens
+            buffer = [sentence]
             current_tokens = sentence_tokens
         else:
-            current_chunk += (". " if current_chunk else "") + sentence
+            buffer.append(sentence)
             current_tokens += sentence_tokens
     
     # Add final chunk
-    if current_chunk:
-        chunks.append((current_chunk.strip(), current_tokens))
-    
-    return chunks
+    if buffer:
+        yield " ".join(buffer).strip(), current_tokens
+
+def chunk_text(text: str, max_tokens: int, exact: bool=True) -> List[Tuple[str, int]]:
+    """Split text into chunks that fit within token limit."""
+    return list(iter_chunks(text, max_tokens, exact))
+
+# HTTP statuses that mean an embedding request was too large, rather than wrong
+_SPLITTABLE_EMBED_STATUSES = (400, 413, 422)
 
 class RaterEmbedderClient(BaseClient):
+    # (query_embedding, query_unit) per query setup, shared by every client in the process
+    _query_cache: Dict[tuple, Tuple[np.ndarray, np.ndarray]] = {}
+
     def __init__(self, config: RaterEmbedderConfig, batch_config: Optional[BatchConfig]=None):
         super().__init__(config, batch_config)
         self.context_length = config.context_length or 32768
-        self.query_embedding = self._compute_query_embedding()
+        try:
+            self.embed_cache_db = self._embed_cache_db()
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"Embedding cache unavailable, continuing without it: {e}")
+            self.embed_cache_db = None
+
+        query_key = (config.provider, config.model, config.base_url, config.query_template, config.user_interests)
+        if query_key not in self._query_cache:
+            query_embedding = self._compute_query_embedding()
+            query_norm = np.linalg.norm(query_embedding)
+            query_unit = query_embedding / query_norm if query_norm > 0 else query_embedding
+            if query_embedding.size > 0:
+                self._query_cache[query_key] = (query_embedding, query_unit)
+        else:
+            query_embedding, query_unit = self._query_cache[query_key]
+        self.query_embedding = query_embedding
+        self.query_unit = query_unit
+
+    def _embed_cache_db(self) -> Optional[Path]:
+        """SQLite file holding embeddings from previous runs, or None when caching is disabled."""
+        if not self.config.cache_dir:
+            return None
+        cache_dir = Path(self.config.cache_dir).expanduser()
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        db_path = cache_dir / "embeddings.db"
+        with closing(sqlite3.connect(db_path)) as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    key TEXT PRIMARY KEY,
+                    vector BLOB NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            conn.commit()
+        return db_path
+
+    def _embed_cache_key(self, text: str) -> str:
+        # The same model name can mean different weights on another provider or endpoint
+        return hashlib.sha256(f"{self.config.provider}\0{self.config.base_url}\0{self.config.model}\0{np.dtype(EMBEDDING_DTYPE).name}\0{text}".encode()).hexdigest()
+
+    def _embed_cache_get(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        """Look up cached embeddings, returning only the keys that were found."""
+        if self.embed_cache_db is None or not keys:
+            return {}
+        found = {}
+        try:
+            with closing(sqlite3.connect(self.embed_cache_db)) as conn:
+                cursor = conn.cursor()
+                for i in range(0, len(keys), 500):
+                    batch = keys[i:i+500]
+                    cursor.execute(
+                        f'SELECT key, vector FROM embeddings WHERE key IN ({",".join("?" * len(batch))})',
+                        batch
+                    )
+                    for key, vector in cursor.fetchall():
+                        found[key] = np.frombuffer(vector, dtype=EMBEDDING_DTYPE)
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to read embedding cache: {e}")
+        return found
+
+    def _embed_cache_put(self, items: Dict[str, np.ndarray]):
+        if self.embed_cache_db is None or not items:
+            return
+        try:
+            with closing(sqlite3.connect(self.embed_cache_db)) as conn:
+                conn.executemany(
+                    'INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)',
+                    [(key, np.asarray(vector, dtype=EMBEDDING_DTYPE).tobytes()) for key, vector in items.items()]
+                )
+                conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to write embedding cache: {e}")
 
-    def _compute_query_embedding(self) -> List[float]:
+    def _compute_query_embedding(self) -> np.ndarray:
         query = self.config.query_template.format(user_interests=self.config.user_interests)
+        cache_key = self._embed_cache_key(query)
+        cached = self._embed_cache_get([cache_key])
+        if cache_key in cached:
+            logger.debug("Loaded query embedding from cache")
+            return cached[cache_key].astype(np.float32)
 
         headers = self._get_headers()
         endpoint = self._get_endpoint_url()
@@ -127,17 +295,27 @@ class RaterEmbedderClient(BaseClient):
                 "input": query
             }
         
-        response = requests.post(endpoint, headers=headers,json=payload)
+        response = self.session.post(endpoint, headers=headers,json=payload)
         response.raise_for_status()
-        result = response.json()
+        result = json_loads(response.content)
 
         if "ollama" in self.config.provider.lower():
-            return result.get("embedding",[])
+            embedding = result.get("embedding",[])
         else:
-            return result["data"][0]["embedding"]
+            embedding = result["data"][0]["embedding"]
+
+        # Round through the cache dtype so fresh and cached queries score identically
+        embedding = np.asarray(embedding, dtype=EMBEDDING_DTYPE).astype(np.float32)
+        if embedding.size > 0:
+            self._embed_cache_put({cache_key: embedding})
+
+        return embedding
 
-    def _build_payload(self, text_chunk: str):
-        if "ollama" in self.config.provider.lower() or self.config.base_url.startswith("http://localhost"):
+    def _uses_ollama_api(self) -> bool:
+        return "ollama" in self.config.provider.lower() or self.config.base_url.startswith("http://localhost")
+
+    def _build_payload(self, text_chunk: Union[str, List[str]]):
+        if self._uses_ollama_api():
             payload = {
                 "model": self.config.model,
                 "prompt": text_chunk
@@ -145,19 +323,113 @@ class RaterEmbedderClient(BaseClient):
         else:
             payload = {
                 "model": self.config.model,
-                "input": [text_chunk]
+                "input": text_chunk if isinstance(text_chunk, list) else [text_chunk]
             }
         return payload
     
     def _get_endpoint_url(self):
-        if "ollama" in self.config.provider.lower() or self.config.base_url.startswith("http://localhost"):
+        if self._uses_ollama_api():
             endpoint = f"{self.config.base_url.rstrip('/')}/api/embeddings"
         else:
             endpoint = f"{self.config.base_url.rstrip('/')}/embeddings"
         return endpoint
     
-    def _parse_response(self, response):
-        result = json.loads(response)
+    @staticmethod
+    def _extract_embeddings(result: dict, n_inputs: int) -> List[Optional[np.ndarray]]:
+        """Pull embeddings out of an Ollama or OpenAI-style response, in input order."""
+        if "embedding" in result:
+            raw_embeddings = [result["embedding"]]
+        else:
+            raw_embeddings = [None] * n_inputs
+            for position, item in enumerate(result.get("data", [])):
+                index = item.get("index", position)
+                if 0 <= index < n_inputs:
+                    raw_embeddings[index] = item.get("embedding")
+
+        embeddings = []
+        for raw in raw_embeddings:
+            embeddings.append(np.asarray(raw, dtype=EMBEDDING_DTYPE) if raw else None)
+        return embeddings
+
+    def get_embeddings(self, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """
+        Embed texts, sending as many per request as the endpoint accepts.
+        OpenAI-compatible endpoints take a list input, so texts are grouped into requests of
+        at most config.batch_size; Ollama's /api/embeddings takes one prompt per request.
+        Requests run concurrently, bounded by batch_config.max_concurrent.
+        Identical texts (shared boilerplate across papers) are embedded only once, and texts
+        embedded in previous runs are served from the on-disk cache.
+        Returns embeddings in input order, with None for texts whose request failed.
+        """
+        if not texts:
+            return []
+
+        # Deduplicate by content hash, remembering where each unique text maps back to
+        unique_index = {}
+        unique_texts = []
+        positions = []
+        for text in texts:
+            key = hashlib.blake2b(text.encode(), digest_size=16).digest()
+            if key not in unique_index:
+                unique_index[key] = len(unique_texts)
+                unique_texts.append(text)
+            positions.append(unique_index[key])
+        if len(unique_texts) < len(texts):
+            logger.debug(f"Embedding {len(unique_texts)} unique chunks out of {len(texts)}")
+
+        unique_keys = [self._embed_cache_key(text) for text in unique_texts]
+        cached = self._embed_cache_get(unique_keys)
+        missing = [i for i, key in enumerate(unique_keys) if key not in cached]
+        missing_texts = [unique_texts[i] for i in missing]
+        if cached:
+            logger.info(f"Loaded {len(unique_texts) - len(missing)} of {len(unique_texts)} chunk embeddings from cache")
+
+        if self._uses_ollama_api():
+            groups = [missing_texts[i:i+1] for i in range(len(missing_texts))]
+        else:
+            batch_size = max(1, self.config.batch_size)
+            groups = [missing_texts[i:i+batch_size] for i in range(0, len(missing_texts), batch_size)]
+
+        def embed_group(group: List[str]) -> List[Optional[np.ndarray]]:
+            try:
+                payload = self._build_payload(group[0] if self._uses_ollama_api() else group)
+                result, usage_info = self._make_sync_request(payload)
+                if usage_info and (usage_info.prompt_tokens > 0 or usage_info.completion_tokens > 0):
+                    logger.info(f"Embedded {len(group)} chunks with embedder {usage_info}")
+                else:
+                    logger.info(f"Embedded {len(group)} chunks with embedder {self.config.model} (usage info unavailable)")
+                return self._extract_embeddings(result, len(group))
+            except requests.HTTPError as e:
+                # A size-type rejection of a list request usually means the provider caps inputs per request
+                # below batch_size; retry in halves rather than losing the whole group. Auth and not-found errors
+                # (bad key, wrong model) fail the same way at any size, so those fail straight away.
+                status = e.response.status_code if e.response is not None else None
+                if len(group) > 1 and status in _SPLITTABLE_EMBED_STATUSES:
+                    logger.warning(f"Embedding request for {len(group)} chunks rejected (HTTP {status}), retrying in smaller requests")
+                    half = len(group) // 2
+                    return embed_group(group[:half]) + embed_group(group[half:])
+                logger.error(f"Embedding request for {len(group)} chunks failed: {e}", exc_info=True)
+                return [None] * len(group)
+            except Exception as e:
+                logger.error(f"Embedding request for {len(group)} chunks failed: {e}", exc_info=True)
+                return [None] * len(group)
+
+        group_results = []
+        if groups:
+            max_workers = min(self.batch_config.max_concurrent, len(groups))
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                group_results = list(executor.map(embed_group, groups))
+        fetched = [embedding for group_result in group_results for embedding in group_result]
+
+        unique_embeddings = [cached.get(key) for key in unique_keys]
+        for i, embedding in zip(missing, fetched):
+            unique_embeddings[i] = embedding
+        self._embed_cache_put({unique_keys[i]: embedding for i, embedding in zip(missing, fetched) if embedding is not None})
+
+        return [unique_embeddings[position] for position in positions]
+
+    def _parse_response(self, response: Union[str, dict]):
+        result = json_loads(response) if isinstance(response, (str, bytes)) else response
 
         if "ollama" in self.config.provider.lower():
             doc_embedding = result.get("embedding",[])
@@ -166,17 +438,17 @@ class RaterEmbedderClient(BaseClient):
 
         return cosine_similarity(self.query_embedding, doc_embedding)
 
-    def _make_sync_request(self, payload) -> tuple[str, Optional[UsageInfo]]:
+    def _make_sync_request(self, payload) -> tuple[dict, Optional[UsageInfo]]:
         """Override to handle embedding response with usage tracking"""
         payload.pop('stream',None)
 
         headers = self._get_headers()
         endpoint = self._get_endpoint_url()
 
-        response = requests.post(endpoint, headers=headers,json=payload)
+        response = self._post_with_backoff(endpoint, headers, payload)
         response.raise_for_status()
 
-        result = response.json()
+        result = json_loads(response.content)
 
         # Extract usage information if available
         usage_info = UsageInfo(provider=self.config.provider, model=self.config.model)
@@ -186,7 +458,8 @@ class RaterEmbedderClient(BaseClient):
             usage_info.completion_tokens = usage_data.get("completion_tokens", 0)
             usage_info.update_total()
 
-        return json.dumps(result), usage_info
+        # Hand the decoded body straight to _parse_response instead of re-serializing it
+        return result, usage_info
     
     def process_single(self, input_data, sleep_time = 0.0, return_usage=False):
         """Process single input, raising exception on failure."""
@@ -203,23 +476,32 @@ class RaterEmbedderClient(BaseClient):
 class RaterLLMClient(BaseClient):
     def __init__(self, config: RaterLLMConfig, batch_config: Optional[BatchConfig]=None):
         super().__init__(config, batch_config)
-        # estimate available context
+
+        # Criteria are fixed for the client's lifetime, so build the prompt text and weights once
+        self._criteria_keys = list(config.criteria.keys())
+        self._criteria_text = "\n".join(f"- {criterion}: {details['description']}" for criterion, details in config.criteria.items())
+        self._weights = np.array([details['weight'] for details in config.criteria.values()], dtype=np.float64)
+
+    @cached_property
+    def available_context(self) -> int:
+        """Tokens left for paper text, counted once per client on first use."""
         prompt_tokens = 0
-        if config.system_prompt:
-            prompt_tokens += count_tokens(config.system_prompt)
-        if config.user_prompt_template:
-            prompt_tokens += count_tokens(config.user_prompt_template)
+        if self.config.system_prompt:
+            prompt_tokens += count_tokens(self.config.system_prompt)
+        if self.config.user_prompt_template:
+            prompt_tokens += count_tokens(self.config.user_prompt_template)
         safety_margin = 512
-        output_tokens = config.completion_options.get('max_tokens', 1024)
-        base_context = config.context_length or 65536
-        self.available_context = base_context - prompt_tokens - output_tokens - safety_margin
+        output_tokens = self.config.completion_options.get('max_tokens', 1024)
+        base_context = self.config.context_length or 65536
+        return base_context - prompt_tokens - output_tokens - safety_margin
 
     def _build_payload(self, parsed_content: str) -> dict:
         """Build API payload for rating request."""
-        token_count = count_tokens(parsed_content)
-        if token_count > self.available_context:
-            logger.warning(f"Content too long ({token_count} tokens), truncated to {self.available_context} tokens.")
-            parsed_content = truncate_to_tokens(parsed_content, self.available_context)
+        if not fits_in_tokens(parsed_content, self.available_context):
+            token_count = count_tokens(parsed_content)
+            if token_count > self.available_context:
+                logger.warning(f"Content too long ({token_count} tokens), truncated to {self.available_context} tokens.")
+                parsed_content = truncate_to_tokens(parsed_content, self.available_context)
         
         messages = self._create_messages(parsed_content)
 
@@ -247,32 +529,52 @@ class RaterLLMClient(BaseClient):
         else:
             return f"{self.config.base_url.rstrip('/')}/chat/completions"
         
-    def _parse_response(self, response_content) -> float:
+    def _parse_response(self, response_content) -> Optional[float]:
+        cleaned = _CODE_FENCE.sub('', response_content.strip())
         try:
-            response = repair_json(response_content)
-            response = response.replace('```jons','').replace('```','').strip()
-            ratings_data = json.loads(response)
-            
-            weighted_sum = 0.0
-            total_weight = 0.0
-
-            for criterion, details in self.config.criteria.items():
-                if criterion in ratings_data and 'score' in ratings_data[criterion]:
-                    score = float(ratings_data[criterion]['score'])
-                    weight = details['weight']
-                    weighted_sum += weight*score
-                    total_weight += weight
-
-            if total_weight > 0:
-                final_score = weighted_sum / total_weight
-            else:
-                final_score = 0.0
-                
-        except Exception as e:
-            #print(f"error parsing response {response}: {e}")
+            ratings_data = json_loads(cleaned)
+        except json.JSONDecodeError:
+            try:
+                ratings_data = json.loads(repair_json(cleaned))
+            except Exception:
+                return None
+
+        if not isinstance(ratings_data, dict):
             return None
-        
-        return final_score
+
+        # Criteria without a usable score stay NaN and are left out of the weighted average
+        scores = np.full(len(self._criteria_keys), np.nan, dtype=np.float64)
+        for i, criterion in enumerate(self._criteria_keys):
+            rating = ratings_data.get(criterion)
+            if not isinstance(rating, dict):
+                continue
+            score = rating.get('score')
+            if isinstance(score, str):
+                try:
+                    score = float(score)
+                except ValueError:
+                    continue
+            if not isinstance(score, (int, float)) or isinstance(score, bool):
+                continue
+            scores[i] = score
+
+        rated = ~np.isnan(scores)
+        total_weight = float(self._weights[rated].sum())
+        if total_weight > 0:
+            return float((scores[rated] * self._weights[rated]).sum() / total_weight)
+        return 0.0
+
+    def _stream_complete(self, partial_response: str) -> bool:
+        """The ratings object has closed; text generated after it is not collected."""
+        if not partial_response.rstrip().endswith('}'):
+            return False
+        cleaned = _CODE_FENCE.sub('', partial_response.strip())
+        if cleaned.count('{') != cleaned.count('}'):
+            return False
+        try:
+            return isinstance(json_loads(cleaned), dict)
+        except ValueError:
+            return False
 
     def _create_messages(self, parsed_content) -> list:
         """Create message list."""
@@ -282,13 +584,7 @@ class RaterLLMClient(BaseClient):
             messages.append({"role": "system", "content": self.config.system_prompt})
         
         # Make user prompt
-        criteria_descriptions = []
-        for criterion, details in self.config.criteria.items():
-            criteria_descriptions.append(f"- {criterion}: {details['description']}")
-
-        criteria_text = "\n".join(criteria_descriptions)
-
-        user_content = self.config.user_prompt_template.format(criteria_text=criteria_text,paper_text=parsed_content)
+        user_content = self.config.user_prompt_template.format(criteria_text=self._criteria_text,paper_text=parsed_content)
         messages.append({"role": "user", "content": user_content})
         return messages
 
@@ -305,74 +601,94 @@ class RaterLLMClient(BaseClient):
 def rate_embed(parsed_contents: List[str], config: RaterConfig, batch_config: Optional[BatchConfig]=None) -> List[RateResult]:
     """Rate papers using embedding similarity with text chunking."""
     embedder_client = RaterEmbedderClient(config.embedder, batch_config)
-    results = []
     
     logger.info(f"Starting embedding-based rating for {len(parsed_contents)} papers")
-    for content in parsed_contents:
+
+    # Without a query embedding there is nothing to compare against; fail each paper instead of the whole call
+    if embedder_client.query_unit.size == 0:
+        logger.error("Embedding rating failed: the embedder returned an empty query embedding")
+        return [
+            RateResult(
+                score=0.0,
+                success=False,
+                error="Query embedding unavailable (empty embedding returned for the query)",
+                method="embed"
+            )
+            for _ in parsed_contents
+        ]
+
+    # Chunk every paper up front so chunks of all papers share batched embedding requests
+    chunk_owners = []
+    chunk_texts = []
+    chunk_weights = []
+    errors = {}
+    for paper_idx, content in enumerate(parsed_contents):
         try:
-            # Handle text chunking here
             token_count = count_tokens(content)
-            
             if token_count <= embedder_client.context_length:
-                # Text fits, get similarity directly
-                similarity_score, usage_info = embedder_client.process_single(content, return_usage=True)
-                if usage_info and (usage_info.prompt_tokens > 0 or usage_info.completion_tokens > 0):
-                    logger.info(f"Rated paper with embedder {usage_info}")
-                else:
-                    logger.info(f"Rated paper with embedder {embedder_client.config.model} (usage info unavailable)")
+                chunks = [(content, token_count)]
             else:
-                # Text too long, chunk and get weighted average
-                chunks = chunk_text(content, embedder_client.context_length)
-                chunk_texts = [chunk[0] for chunk in chunks]
-                chunk_weights = [chunk[1] for chunk in chunks]
-                
-                # Get similarities for all chunks
-                chunk_similarities = [embedder_client.process_single(chunk_text, return_usage=False)[0] for chunk_text in chunk_texts]
-
-                # Calculate weighted average, filtering out None values (failed API calls)
-                valid_pairs = [(sim, weight) for sim, weight in zip(chunk_similarities, chunk_weights) if sim is not None]
-
-                if valid_pairs:
-                    total_weight = sum(weight for _, weight in valid_pairs)
-                    if total_weight > 0:
-                        weighted_similarity = sum(sim * weight for sim, weight in valid_pairs) / total_weight
-                    else:
-                        weighted_similarity = 0.0
-                else:
-                    # All chunks failed - this is a complete failure
-                    weighted_similarity = None
-                
-                similarity_score = weighted_similarity
-                logger.info(f"Rated paper with embedder {embedder_client.config.model} ({len(chunks)} chunks)")
-            
-            results.append(RateResult(
-                score=similarity_score if similarity_score is not None else 0.0,
-                success=similarity_score is not None,
-                error=None if similarity_score is not None else "Embedding failed",
-                method="embed"
-            ))
-            
+                chunks = chunk_text(content, embedder_client.context_length, exact=config.embedder.exact_chunk_tokens)
         except Exception as e:
             logger.error(f"Embedding rating failed: {e}",exc_info=True)
+            errors[paper_idx] = str(e)
+            continue
+
+        for text, weight in chunks:
+            chunk_owners.append(paper_idx)
+            chunk_texts.append(text)
+            chunk_weights.append(weight)
+
+    embeddings = embedder_client.get_embeddings(chunk_texts)
+
+    # Score all chunks at once, then scatter back to their papers as token-weighted averages
+    valid = [i for i, embedding in enumerate(embeddings) if embedding is not None] # skip failed API calls
+    owners = np.asarray([chunk_owners[i] for i in valid], dtype=np.intp)
+    weights = np.asarray([chunk_weights[i] for i in valid], dtype=np.float64)
+    if valid:
+        similarities = cosine_similarities(embedder_client.query_unit, [embeddings[i] for i in valid])
+    else:
+        similarities = np.zeros(0, dtype=np.float32)
+    weighted_sums = np.bincount(owners, weights=similarities * weights, minlength=len(parsed_contents))
+    total_weights = np.bincount(owners, weights=weights, minlength=len(parsed_contents))
+    has_valid_chunk = np.bincount(owners, minlength=len(parsed_contents)) > 0
+
+    results = []
+    for paper_idx in range(len(parsed_contents)):
+        if paper_idx in errors:
             results.append(RateResult(
                 score=0.0,
                 success=False,
-                error=str(e),
+                error=errors[paper_idx],
                 method="embed"
             ))
+            continue
+
+        if has_valid_chunk[paper_idx]:
+            similarity_score = float(weighted_sums[paper_idx] / total_weights[paper_idx]) if total_weights[paper_idx] > 0 else 0.0
+        else:
+            # All chunks failed - this is a complete failure
+            similarity_score = None
+
+        results.append(RateResult(
+            score=similarity_score if similarity_score is not None else 0.0,
+            success=similarity_score is not None,
+            error=None if similarity_score is not None else "Embedding failed",
+            method="embed"
+        ))
     logger.info(f"Embedding rating completed: {len([r for r in results if r.success])} successful, {len([r for r in results if not r.success])} failed")
     
     return results
 
 def rate_llm(parsed_contents: List[str], config: RaterConfig, batch_config: Optional[BatchConfig]=None) -> List[RateResult]:
-    """Rate multiple papers using batch processing when configured"""
+    """Rate multiple papers using batch processing when configured."""
     logger.info(f"Starting LLM-based rating for {len(parsed_contents)} papers (batch={getattr(config.llm, 'batch', False)})")
     if not getattr(config.llm, 'batch', False):
         client = RaterLLMClient(config.llm,batch_config)
         final_results = []
-        for content in parsed_contents:
-            token_count = count_tokens(content)
-            result, usage_info = client.process_single(content, return_usage=True)
+        # Requests are network-bound, so run them concurrently up to the configured limit
+        responses = client.process_concurrent(parsed_contents, return_usage=True)
+        for result, usage_info in responses:
             final_results.append(
                 RateResult(
                     score=result if result is not None else 0.0,
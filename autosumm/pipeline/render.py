@@ -2,16 +2,27 @@
 Render summary contents to specified format(s).
 """
 
-from typing import List, Optional
+from typing import List, Optional, Callable, Tuple, TYPE_CHECKING
 from dataclasses import dataclass, field
 from pathlib import Path
+import os
+import random
+import shutil
 import subprocess
+import tempfile
+import time
+from uuid import uuid4
 from multiprocessing import Pool
+from concurrent.futures import ThreadPoolExecutor
 import re
 import logging
 from datetime import datetime
 from contextlib import contextmanager
-from pymarkdown.api import PyMarkdownApi, PyMarkdownApiException
+from functools import lru_cache, cached_property
+
+if TYPE_CHECKING:
+    # PyMarkdown takes a noticeable share of startup time, so it is only imported once linting starts
+    from pymarkdown.api import PyMarkdownApi
 
 logger = logging.getLogger(__name__)
 
@@ -35,6 +46,32 @@ class PDFRendererConfig:
     list_par_sep: str="0pt"
     list_top_sep: str="6pt"
 
+    @cached_property
+    def pandoc_base_args(self) -> Tuple[str, ...]:
+        """pandoc options for this config, built once; the settings are not changed after loading."""
+        args = [
+            "-f", self.pandoc_from_format,
+            "-t", "pdf",
+            f"--pdf-engine={self.pdf_engine}",
+            f"--highlight-style={self.highlight_style}",
+            "--variable", f"classoption={self.font_size}",
+            "--variable", f"documentclass={self.document_class}",
+            "--variable", f"geometry:margin={self.margin}",
+            "--variable", f"linestretch={self.line_stretch}",
+            "--variable", f"itemsep={self.list_item_sep}",
+            "--variable", f"parsep={self.list_par_sep}",
+            "--variable", f"topsep={self.list_top_sep}",
+            "--from", self.pandoc_input_format
+        ]
+
+        if self.colorlinks:
+            args.extend([
+                "--variable", "colorlinks=true",
+                "--variable", f"linkcolor={self.link_color}"
+            ])
+
+        return tuple(args)
+
 @dataclass
 class HTMLRendererConfig:
     math_renderer: str="mathjax"
@@ -59,12 +96,15 @@ class AZW3RendererConfig:
     language: str = "en"
     description: Optional[str] = None
     cover_image: Optional[str] = None
+    direct_markdown: bool = False  # Let ebook-convert read the markdown itself, skipping pandoc's ePub step (no pandoc math/highlighting)
 
 @dataclass
 class RendererConfig:
     formats: List[str]=field(default_factory=lambda: ["pdf","md"]) # allowed formats: pdf, html, md, epub, mp3, wav, ogg
     output_dir: str="./output"
     base_filename: Optional[str]=None # If None, auto-generate timestamp-based name
+    pre_validate: bool=False # If True, check every summary separately before rendering instead of only after a failure
+    parallel_runtime: bool=False # If True, start pandoc's runtime on all cores for the final render (needs a threaded pandoc build)
     md: MarkdownRendererConfig=field(default_factory=MarkdownRendererConfig)
     pdf: PDFRendererConfig=field(default_factory=PDFRendererConfig)
     html: HTMLRendererConfig=field(default_factory=HTMLRendererConfig)
@@ -79,15 +119,12 @@ class RenderResult:
 
 def _generate_base_filename(category: str, config: RendererConfig) -> str:
     """Generate base filename"""
-    now = datetime.now()
-
-    category_clean = category.replace('.','')
-
-    date_str = now.strftime("%y%m%d")
+    date_str = datetime.now().strftime("%y%m%d")
 
     if config.base_filename:
         return f"{config.base_filename}_{date_str}"
 
+    category_clean = category.replace('.','')
     return f"summary_{category_clean}_{date_str}"
 
 def _ensure_output_dir(output_dir: str) -> Path:
@@ -99,48 +136,223 @@ def _ensure_output_dir(output_dir: str) -> Path:
 @contextmanager
 def preserve_logging_handlers():
     """
-    A context manager to preserve and restore the root logger's handlers
+    A context manager to preserve and restore the root logger's handlers and level
     """
     root_logger = logging.getLogger()
     original_handlers = root_logger.handlers[:]
+    original_level = root_logger.level
     try:
         yield
     finally:
         root_logger.handlers = original_handlers
+        # PyMarkdown also lowers the root level to WARNING when it runs in this process
+        root_logger.setLevel(original_level)
+
+@lru_cache(maxsize=1)
+def _get_pymarkdown_api() -> "PyMarkdownApi":
+    """One PyMarkdownApi per worker process, so plugin loading is paid once rather than per summary."""
+    from pymarkdown.api import PyMarkdownApi
+    return PyMarkdownApi()
 
 def _fix_single_markdown(summary: str) -> str:
     """Fixes a single markdown string using PyMarkdownApi.
     This is designed to be called in a subprocess pool."""
+    from pymarkdown.api import PyMarkdownApiException
     try:
-        # PyMarkdownApi calls logging.basicConfig() somewhere inside its own code, therefore corrupts logging,
-        # but it's fine inside a sandboxed process
-        api = PyMarkdownApi()
+        # PyMarkdownApi calls logging.basicConfig() somewhere inside its own code, therefore corrupts logging;
+        # fine inside a worker process, and undone by preserve_logging_handlers when linting in-process
+        api = _get_pymarkdown_api()
         fix_result = api.fix_string(summary)
         return fix_result.fixed_file
     except PyMarkdownApiException:
         return summary
 
-def render_md(summaries: List[str], category: str, config: RendererConfig) -> RenderResult:
-    output_path = _ensure_output_dir(config.output_dir)
-    base_filename = _generate_base_filename(category, config)
-    md_file = output_path / f"{base_filename}.md"
-
+def _lint_summaries(summaries: List[str]) -> List[str]:
+    """Lint summaries in a process pool, falling back to the raw markdown on failure."""
+    if not summaries:
+        return []
     try:
         with preserve_logging_handlers():
-            with Pool() as pool:
-                fixed_summaries = pool.map(_fix_single_markdown,summaries)
-            logger.info("Successfully linted markdown.")
+            # Import in the parent so forked workers inherit the loaded modules instead of each importing them
+            import pymarkdown.api
+            workers = min(len(summaries), os.cpu_count() or 1)
+            if workers == 1:
+                # Spawning a worker costs more than fixing one summary (or a few on a single core)
+                fixed_summaries = [_fix_single_markdown(summary) for summary in summaries]
+            else:
+                # No more worker processes than summaries; each worker pays interpreter and PyMarkdown startup
+                with Pool(processes=workers) as pool:
+                    fixed_summaries = pool.map(_fix_single_markdown,summaries)
     except Exception as e:
         logger.warning(f"Failed to lint markdown: {e}. Falling back to raw markdown.")
-        fixed_summaries = summaries
+        return summaries
+    # Logged once the root logger's level is restored, so an in-process lint does not swallow it
+    logger.info("Successfully linted markdown.")
+    return fixed_summaries
+
+def _markdown_separator(config: RendererConfig) -> str:
+    return "\n\n\\pagebreak\n\n" if config.md.include_pagebreaks else "\n\n"
+
+def _compose_markdown(fixed_summaries: List[str], config: RendererConfig) -> str:
+    """Join linted summaries into a single markdown document."""
+    return _markdown_separator(config).join(fixed_summaries)
+
+# Inline \(...\) math (never spans lines) becomes $...$, blank-line runs collapse to one paragraph break
+_INLINE_MATH_OR_MULTI_NEWLINE = re.compile(r'\\\((.*?)\\\)|\n{3,}')
+# Page breaks (with their surrounding whitespace) and blank-line runs both collapse to one paragraph break
+_PAGEBREAK_OR_MULTI_NEWLINE = re.compile(r'[ \t]*\n*[ \t]*\\pagebreak\s*|\n{3,}')
+
+def _pdf_fixup(match: re.Match) -> str:
+    math = match.group(1)
+    return f"${math}$" if math is not None else '\n\n'
+
+def _compose_pdf_markdown(fixed_summaries: List[str], config: RendererConfig) -> str:
+    """Markdown document ready for the PDF pandoc call."""
+    return _INLINE_MATH_OR_MULTI_NEWLINE.sub(_pdf_fixup, _compose_markdown(fixed_summaries, config))
+
+def _compose_html_markdown(fixed_summaries: List[str]) -> str:
+    """Markdown document ready for the HTML/ePub pandoc calls: joined without page breaks, cleaned in one pass."""
+    return _PAGEBREAK_OR_MULTI_NEWLINE.sub('\n\n', "\n\n".join(fixed_summaries))
+
+def _pandoc_rts_args(config: RendererConfig) -> List[str]:
+    """GHC runtime flags that let pandoc use every core, if enabled. Meant for the final render only:
+    scratch renders convert small subsets, where starting extra capabilities costs more than it saves."""
+    if not config.parallel_runtime:
+        return []
+    return ["+RTS", f"-N{os.cpu_count() or 1}", "-RTS"]
+
+# stderr fragments of failures that come from the environment rather than the document, worth another try
+_TRANSIENT_PANDOC_ERRORS = ("I/O error", "Resource temporarily unavailable", "HttpExceptionRequest", "Could not fetch")
+_PANDOC_RETRY_BACKOFF = (1, 4)  # seconds before the 2nd and 3rd attempt, plus jitter
+
+def _run_pandoc(cmd: List[str], content: str):
+    """Run pandoc with the markdown content piped through stdin, retrying failures that look transient."""
+    for attempt in range(len(_PANDOC_RETRY_BACKOFF) + 1):
+        try:
+            # Output goes to -o; only stderr is kept, for error reporting. LaTeX logs are not always valid UTF-8.
+            subprocess.run(cmd, input=content, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, encoding='utf-8', errors='replace')
+            return
+        except subprocess.CalledProcessError as e:
+            # Document errors fail the same way every time; those go straight back to the caller
+            if attempt == len(_PANDOC_RETRY_BACKOFF) or not any(p in (e.stderr or "") for p in _TRANSIENT_PANDOC_ERRORS):
+                raise
+            delay = _PANDOC_RETRY_BACKOFF[attempt] * random.uniform(1, 1.5)
+            logger.warning(f"pandoc failed with a transient error, retrying in {delay:.1f}s: {_error_message(e)}")
+            time.sleep(delay)
+
+_STDERR_TAIL_LINES = 5
+
+def _error_message(e: Exception) -> str:
+    """Error text for a render result; a failed converter run also contributes the last lines of its stderr."""
+    message = str(e)
+    if isinstance(e, subprocess.CalledProcessError) and e.stderr:
+        stderr = e.stderr if isinstance(e.stderr, str) else e.stderr.decode('utf-8', errors='replace')
+        # The cause is at the end of the output; LaTeX in particular logs pages of progress before it
+        tail = [line.strip() for line in stderr.strip().splitlines()[-_STDERR_TAIL_LINES:]]
+        message += " " + " ".join(line for line in tail if line)
+    return message
+
+def _pandoc_pdf_cmd(config: RendererConfig) -> List[str]:
+    """pandoc arguments for PDF output, without the output file."""
+    return ["pandoc", *config.pdf.pandoc_base_args]
+
+def _pandoc_html_cmd(config: RendererConfig, temp_css: Path) -> List[str]:
+    """pandoc arguments for HTML output, without the output file. temp_css holds css_inline, if set."""
+    cmd = [
+        "pandoc",
+        "-f", "gfm",
+        "-t", "html5" if config.html.html5 else "html",
+        f"--highlight-style={config.html.highlight_style}"
+    ]
 
-    if config.md.include_pagebreaks:
-        separator = "\n\n\\pagebreak\n\n"
-        content = separator.join(fixed_summaries)
-    else:
-        content = "\n\n".join(fixed_summaries)
+    if config.html.standalone:
+        cmd.append("--standalone")
+
+    if config.html.include_toc:
+        cmd.extend(["--toc", f"--toc-depth={config.html.toc_depth}"])
 
-    md_file.write_text(content, encoding='utf-8')
+    if config.html.number_sections:
+        cmd.append("--number-sections")
+
+    if config.html.math_renderer == "mathjax":
+        if config.html.mathjax_url:
+            cmd.append(f"--mathjax={config.html.mathjax_url}")
+        else:
+            cmd.append("--mathjax")
+
+    elif config.html.math_renderer == "katex":
+        if config.html.katex_url:
+            cmd.append(f"--katex={config.html.katex_url}")
+        else:
+            cmd.append("--katex")
+
+    if config.html.self_contained:
+        cmd.append("--self-contained")
+
+    if config.html.css_file:
+        cmd.extend(["--css", config.html.css_file])
+
+    if config.html.css_inline:
+        cmd.extend(["--css", str(temp_css)])
+
+    if config.html.template_file:
+        cmd.extend(["--template", config.html.template_file])
+
+    return cmd
+
+def _pandoc_epub_cmd(config: RendererConfig, title: str) -> List[str]:
+    """pandoc arguments for ePub output, without the output file."""
+    cmd = [
+        "pandoc",
+        "-f", "gfm",
+        "-t", "epub",
+        f"--highlight-style={config.html.highlight_style}",
+        "--metadata", f"title={title}",
+        "--metadata", f"author={config.azw3.author}",
+        "--metadata", f"lang={config.azw3.language}",
+    ]
+
+    if config.azw3.description:
+        cmd.extend(["--metadata", f"description={config.azw3.description}"])
+
+    if config.azw3.cover_image and Path(config.azw3.cover_image).exists():
+        cmd.extend(["--epub-cover-image", config.azw3.cover_image])
+
+    return cmd
+
+def _partial_path(out_file: Path) -> Path:
+    """Sibling of out_file to write into first; keeps the extension, since converters such as calibre go by it."""
+    return out_file.with_name(f"{out_file.stem}.partial{out_file.suffix}")
+
+def _write_atomically(out_file: Path, write: Callable[[Path], None]):
+    """Produce out_file through a partial file and os.replace, so an interrupted run never leaves a truncated output."""
+    partial = _partial_path(out_file)
+    try:
+        write(partial)
+        os.replace(partial, out_file)
+    finally:
+        partial.unlink(missing_ok=True)
+
+_MD_WRITE_BUFFER = 1 << 20
+
+def render_md(summaries: List[str], category: str, config: RendererConfig, lint: bool=True, base_filename: Optional[str]=None, output_path: Optional[Path]=None) -> RenderResult:
+    output_path = output_path or _ensure_output_dir(config.output_dir)
+    base_filename = base_filename or _generate_base_filename(category, config)
+    md_file = output_path / f"{base_filename}.md"
+
+    fixed_summaries = _lint_summaries(summaries) if lint else summaries
+    # Stream summaries to disk instead of materializing the joined document
+    # Binary mode: each piece is encoded exactly once and no newline translation happens on Windows
+    separator = _markdown_separator(config).encode('utf-8')
+    def write(path: Path):
+        # A large buffer turns the many small summary/separator writes into a few syscalls
+        with path.open('wb', buffering=_MD_WRITE_BUFFER) as f:
+            for i, summary in enumerate(fixed_summaries):
+                if i:
+                    f.write(separator)
+                f.write(summary.encode('utf-8'))
+
+    _write_atomically(md_file, write)
 
     return RenderResult(
         path=str(md_file),
@@ -148,75 +360,105 @@ def render_md(summaries: List[str], category: str, config: RendererConfig) -> Re
         success=True
     )
 
-def render_pdf(summaries: List[str], category, config: RendererConfig) -> RenderResult:
-    output_path = _ensure_output_dir(config.output_dir)
-    base_filename = _generate_base_filename(category, config)
-    pdf_file = output_path / f"{base_filename}.pdf"
-    
-    # Test each summary individually first
-    valid_summaries = []
-    error_messages = []
-    
-    for i, summary in enumerate(summaries):
+def _make_scratch_dir() -> Path:
+    """Temporary directory for throwaway renders, on tmpfs when available."""
+    shm = Path("/dev/shm")
+    return Path(tempfile.mkdtemp(prefix="autosumm_", dir=str(shm) if shm.is_dir() else None))
+
+def _render_dropping_failures(summaries: List[str], render_to: Callable[[List[str], Path, bool], None], out_file: Path, pre_validate: bool=False, discard_scratch: bool=False) -> Tuple[List[str], List[str]]:
+    """
+    Render all summaries to out_file in a single pass. Only if that fails, bisect the summaries with
+    scratch renders to find the ones that break conversion, then render the rest. With pre_validate,
+    every summary is instead checked on its own before the render.
+    Returns (rendered summaries, error messages); raises if the remaining summaries still fail together.
+    Only conversion errors trigger the search: a converter that cannot be started (e.g. pandoc not
+    installed) fails every render the same way, so that error is raised straight away.
+    discard_scratch lets scratch renders write to the null device, for converters that take the output
+    format from a flag rather than the file extension.
+    render_to(subset, path, final) is told whether it produces the real output or a throwaway check;
+    real outputs are written atomically.
+    """
+    if not pre_validate:
         try:
-            # Test render this single summary
-            test_config = RendererConfig(
-                formats=["md"],
-                output_dir=str(output_path),
-                base_filename=f"_test_{i}",
-                md=config.md,
-                pdf=config.pdf,
-                html=config.html
-            )
-            
-            test_md = render_md([summary], category, test_config)
-            if test_md.success:
-                # Test PDF conversion for this single summary
-                test_pdf_file = output_path / f"_test_{i}.pdf"
-                test_md_file = Path(test_md.path)
-                
-                content = test_md_file.read_text(encoding='utf-8')
-                content = re.sub(r'\\\((.*?)\\\)', r'$\1$', content)
-                content = re.sub(r'\n{3,}', r'\n\n', content)
-                test_md_file.write_text(content, encoding='utf-8')
-                
-                cmd = [
-                    "pandoc",
-                    str(test_md_file),
-                    "-f", config.pdf.pandoc_from_format,
-                    "-t", "pdf",
-                    f"--pdf-engine={config.pdf.pdf_engine}",
-                    "-o", str(test_pdf_file),
-                    f"--highlight-style={config.pdf.highlight_style}",
-                    "--variable", f"classoption={config.pdf.font_size}",
-                    "--variable", f"documentclass={config.pdf.document_class}",
-                    "--variable", f"geometry:margin={config.pdf.margin}",
-                    "--variable", f"linestretch={config.pdf.line_stretch}",
-                    "--variable", f"itemsep={config.pdf.list_item_sep}",
-                    "--variable", f"parsep={config.pdf.list_par_sep}",
-                    "--variable", f"topsep={config.pdf.list_top_sep}",
-                    "--from", config.pdf.pandoc_input_format
-                ]
-                
-                if config.pdf.colorlinks:
-                    cmd.extend([
-                        "--variable", "colorlinks=true",
-                        "--variable", f"linkcolor={config.pdf.link_color}"
-                    ])
-                
-                subprocess.run(cmd, check=True, capture_output=True, text=True)
-                
-                # Clean up test files
-                test_pdf_file.unlink(missing_ok=True)
-                test_md_file.unlink(missing_ok=True)
-                
-                valid_summaries.append(summary)
-            else:
-                error_messages.append(f"Summary {i+1}: {test_md.error}")
-                
-        except Exception as e:
-            error_messages.append(f"Summary {i+1}: {str(e)}")
-    
+            _write_atomically(out_file, lambda path: render_to(summaries, path, True))
+            return summaries, []
+        except subprocess.CalledProcessError as e:
+            if len(summaries) == 1:
+                return [], [f"Summary 1: {_error_message(e)}"]
+            logger.info(f"Rendering {out_file.name} failed, searching for the summaries that break it")
+
+    # Only the exit status of a scratch render matters, so skip writing its output where possible
+    to_devnull = discard_scratch and os.name == 'posix'
+
+    def fails(indices: List[int]) -> Optional[str]:
+        if to_devnull:
+            test_file = Path(os.devnull)
+        else:
+            test_file = scratch_dir / f"_test_{uuid4().hex}{out_file.suffix}"
+        try:
+            render_to([summaries[i] for i in indices], test_file, False)
+            return None
+        except subprocess.CalledProcessError as e:
+            return _error_message(e)
+        finally:
+            if not to_devnull:
+                test_file.unlink(missing_ok=True)
+
+    bad = {}
+    indices = list(range(len(summaries)))
+    if pre_validate:
+        groups = [[i] for i in indices]
+    else:
+        # The full list is already known to fail, so start from its halves
+        middle = len(indices) // 2
+        groups = [indices[:middle], indices[middle:]]
+
+    # Bisect breadth-first: the scratch renders of one round are independent converter processes, so run them together
+    scratch_dir = None if to_devnull else _make_scratch_dir()
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, min(len(summaries), os.cpu_count() or 1))) as executor:
+            while groups:
+                next_groups = []
+                for group, error in zip(groups, executor.map(fails, groups)):
+                    if error is None:
+                        continue
+                    if len(group) == 1:
+                        bad[group[0]] = error
+                    else:
+                        middle = len(group) // 2
+                        next_groups.extend([group[:middle], group[middle:]])
+                groups = next_groups
+    finally:
+        if scratch_dir is not None:
+            shutil.rmtree(scratch_dir, ignore_errors=True)
+
+    valid_summaries = [summary for i, summary in enumerate(summaries) if i not in bad]
+    error_messages = [f"Summary {i+1}: {bad[i]}" for i in sorted(bad)]
+    if valid_summaries:
+        _write_atomically(out_file, lambda path: render_to(valid_summaries, path, True))
+    return valid_summaries, error_messages
+
+def render_pdf(summaries: List[str], category, config: RendererConfig, lint: bool=True, base_filename: Optional[str]=None, output_path: Optional[Path]=None) -> RenderResult:
+    output_path = output_path or _ensure_output_dir(config.output_dir)
+    base_filename = base_filename or _generate_base_filename(category, config)
+    pdf_file = output_path / f"{base_filename}.pdf"
+    fixed_summaries = _lint_summaries(summaries) if lint else summaries
+
+    cmd = _pandoc_pdf_cmd(config)
+
+    def render_to(subset: List[str], out_file: Path, final: bool):
+        _run_pandoc([*cmd, *(_pandoc_rts_args(config) if final else []), "-o", str(out_file)], _compose_pdf_markdown(subset, config))
+
+    try:
+        valid_summaries, error_messages = _render_dropping_failures(fixed_summaries, render_to, pdf_file, config.pre_validate, discard_scratch=True)
+    except Exception as e:
+        return RenderResult(
+            path="",
+            format="pdf",
+            success=False,
+            error=_error_message(e)
+        )
+
     if not valid_summaries:
         return RenderResult(
             path="",
@@ -224,146 +466,41 @@ def render_pdf(summaries: List[str], category, config: RendererConfig) -> Render
             success=False,
             error="All summaries failed validation: " + "; ".join(error_messages)
         )
-    
-    # Render all valid summaries together
-    try:
-        md_result = render_md(valid_summaries, category, config)
-        if not md_result.success:
-            return RenderResult(
-                path="",
-                format="pdf",
-                success=False,
-                error=f"Failed to create intermediate markdown: {md_result.error}"
-            )
-        
-        md_file = Path(md_result.path)
-        content = md_file.read_text(encoding='utf-8')
-        content = re.sub(r'\\\((.*?)\\\)', r'$\1$', content)
-        content = re.sub(r'\n{3,}', r'\n\n', content)
-        md_file.write_text(content, encoding='utf-8')
 
-        cmd = [
-            "pandoc",
-            str(md_file),
-            "-f", config.pdf.pandoc_from_format,
-            "-t", "pdf",
-            f"--pdf-engine={config.pdf.pdf_engine}",
-            "-o", str(pdf_file),
-            f"--highlight-style={config.pdf.highlight_style}",
-            "--variable", f"classoption={config.pdf.font_size}",
-            "--variable", f"documentclass={config.pdf.document_class}",
-            "--variable", f"geometry:margin={config.pdf.margin}",
-            "--variable", f"linestretch={config.pdf.line_stretch}",
-            "--from", config.pdf.pandoc_input_format
-        ]
+    return RenderResult(
+        path=str(pdf_file),
+        format="pdf",
+        success=True,
+        error=None if not error_messages else f"Skipped {len(error_messages)} summaries: " + "; ".join(error_messages[:3])
+    )
 
-        if config.pdf.colorlinks:
-            cmd.extend([
-                "--variable", "colorlinks=true",
-                "--variable", f"linkcolor={config.pdf.link_color}"
-            ])
+def render_html(summaries: List[str], category, config: RendererConfig, lint: bool=True, base_filename: Optional[str]=None, output_path: Optional[Path]=None) -> RenderResult:
+    output_path = output_path or _ensure_output_dir(config.output_dir)
+    base_filename = base_filename or _generate_base_filename(category, config)
+    html_file = output_path / f"{base_filename}.html"
+    fixed_summaries = _lint_summaries(summaries) if lint else summaries
+    temp_css = output_path / f"temp_{base_filename}.css"
 
-        subprocess.run(cmd, check=True, capture_output=True, text=True)
-        
-        if md_result.path and Path(md_result.path).exists():
-            Path(md_result.path).unlink(missing_ok=True)
+    cmd = _pandoc_html_cmd(config, temp_css)
 
-        return RenderResult(
-            path=str(pdf_file),
-            format="pdf",
-            success=True,
-            error=None if not error_messages else f"Skipped {len(error_messages)} summaries: " + "; ".join(error_messages[:3])
-        )
-        
+    def render_to(subset: List[str], out_file: Path, final: bool):
+        _run_pandoc([*cmd, *(_pandoc_rts_args(config) if final else []), "-o", str(out_file)], _compose_html_markdown(subset))
+
+    try:
+        if config.html.css_inline:
+            temp_css.write_bytes(config.html.css_inline.encode('utf-8'))
+        valid_summaries, error_messages = _render_dropping_failures(fixed_summaries, render_to, html_file, config.pre_validate, discard_scratch=True)
     except Exception as e:
         return RenderResult(
             path="",
-            format="pdf",
+            format="html",
             success=False,
-            error=str(e)
+            error=_error_message(e)
         )
+    finally:
+        # Clean up temporary files
+        temp_css.unlink(missing_ok=True)
 
-def render_html(summaries: List[str], category, config: RendererConfig) -> RenderResult:
-    output_path = _ensure_output_dir(config.output_dir)
-    base_filename = _generate_base_filename(category, config)
-    html_file = output_path / f"{base_filename}.html"
-    
-    # Test each summary individually first
-    valid_summaries = []
-    error_messages = []
-    
-    for i, summary in enumerate(summaries):
-        try:
-            # Test render this single summary
-            test_config = RendererConfig(
-                formats=["md"],
-                output_dir=str(output_path),
-                base_filename=f"_test_{i}",
-                md=config.md,
-                pdf=config.pdf,
-                html=config.html
-            )
-            
-            test_md = render_md([summary], category, test_config)
-            if test_md.success:
-                # Test HTML conversion for this single summary
-                test_html_file = output_path / f"_test_{i}.html"
-                test_md_file = Path(test_md.path)
-                
-                content = test_md_file.read_text(encoding='utf-8')
-                content = re.sub(r'\n{3,}', r'\n\n', content)
-                content = content.replace("\\pagebreak","")
-                test_md_file.write_text(content, encoding='utf-8')
-                
-                cmd = [
-                    "pandoc",
-                    str(test_md_file),
-                    "-f", "gfm",
-                    "-t", "html5" if config.html.html5 else "html",
-                    "-o", str(test_html_file),
-                    f"--highlight-style={config.html.highlight_style}"
-                ]
-                
-                if config.html.standalone:
-                    cmd.append("--standalone")
-                
-                if config.html.include_toc:
-                    cmd.extend(["--toc", f"--toc-depth={config.html.toc_depth}"])
-
-                if config.html.number_sections:
-                    cmd.append("--number-sections")
-
-                if config.html.math_renderer == "mathjax":
-                    if config.html.mathjax_url:
-                        cmd.append(f"--mathjax={config.html.mathjax_url}")
-                    else:
-                        cmd.append("--mathjax")
-                
-                elif config.html.math_renderer == "katex":
-                    if config.html.katex_url:
-                        cmd.append(f"--katex={config.html.katex_url}")
-                    else:
-                        cmd.append("--katex")
-
-                if config.html.self_contained:
-                    cmd.append("--self-contained")
-                
-                if config.html.css_file:
-                    cmd.extend(["--css", config.html.css_file])
-
-                subprocess.run(cmd, check=True, capture_output=True, text=True)
-                
-                # Clean up test files
-                test_html_file.unlink(missing_ok=True)
-                test_md_file.unlink(missing_ok=True)
-                
-                valid_summaries.append(summary)
-            else:
-                error_messages.append(f"Summary {i+1}: {test_md.error}")
-                
-        except Exception as e:
-            error_messages.append(f"Summary {i+1}: {str(e)}")
-    
     if not valid_summaries:
         return RenderResult(
             path="",
@@ -371,179 +508,81 @@ def render_html(summaries: List[str], category, config: RendererConfig) -> Rende
             success=False,
             error="All summaries failed validation: " + "; ".join(error_messages)
         )
-    
-    # Render all valid summaries together
-    try:
-        md_result = render_md(valid_summaries, category, config)
-        if not md_result.success:
-            return RenderResult(
-                path="",
-                format="html",
-                success=False,
-                error=f"Failed to create intermediate markdown: {md_result.error}"
-            )
-        
-        md_file = Path(md_result.path)
-        content = md_file.read_text(encoding='utf-8')
-        content = re.sub(r'\n{3,}', r'\n\n', content)
-        content = content.replace("\\pagebreak","")
-        md_file.write_text(content, encoding='utf-8')
 
+    return RenderResult(
+        path=str(html_file),
+        format="html",
+        success=True,
+        error=None if not error_messages else f"Skipped {len(error_messages)} summaries: " + "; ".join(error_messages[:3])
+    )
+
+def render_azw3(summaries: List[str], category, config: RendererConfig, lint: bool=True, base_filename: Optional[str]=None, output_path: Optional[Path]=None) -> RenderResult:
+    output_path = output_path or _ensure_output_dir(config.output_dir)
+    base_filename = base_filename or _generate_base_filename(category, config)
+    azw3_file = output_path / f"{base_filename}.azw3"
+    epub_file = output_path / f"{base_filename}.epub"
+    fixed_summaries = _lint_summaries(summaries) if lint else summaries
+
+    title = config.azw3.title or f'ArXiv Summaries - {category}'
+
+    def calibre_cmd(input_file: Path, out_file: Path) -> List[str]:
         cmd = [
-            "pandoc",
-            str(md_file),
-            "-f", "gfm",
-            "-t", "html5" if config.html.html5 else "html",
-            "-o", str(html_file),
-            f"--highlight-style={config.html.highlight_style}"
+            config.azw3.calibre_path or "ebook-convert",
+            str(input_file),
+            str(out_file),
+            "--title", title,
+            "--authors", config.azw3.author,
+            "--language", config.azw3.language
         ]
 
-        if config.html.standalone:
-            cmd.append("--standalone")
-        
-        if config.html.include_toc:
-            cmd.extend(["--toc", f"--toc-depth={config.html.toc_depth}"])
+        if config.azw3.description:
+            cmd.extend(["--description", config.azw3.description])
 
-        if config.html.number_sections:
-            cmd.append("--number-sections")
+        if config.azw3.cover_image and Path(config.azw3.cover_image).exists():
+            cmd.extend(["--cover", config.azw3.cover_image])
 
-        if config.html.math_renderer == "mathjax":
-            if config.html.mathjax_url:
-                cmd.append(f"--mathjax={config.html.mathjax_url}")
-            else:
-                cmd.append("--mathjax")
-        
-        elif config.html.math_renderer == "katex":
-            if config.html.katex_url:
-                cmd.append(f"--katex={config.html.katex_url}")
-            else:
-                cmd.append("--katex")
+        return cmd
 
-        if config.html.self_contained:
-            cmd.append("--self-contained")
-        
-        if config.html.css_file:
-            cmd.extend(["--css", config.html.css_file])
-        
-        if config.html.css_inline:
-            temp_css = output_path / f"temp_{base_filename}.css"
-            temp_css.write_text(config.html.css_inline, encoding='utf-8')
-            cmd.extend(["--css", str(temp_css)])
+    def render_direct(subset: List[str], out_file: Path, final: bool):
+        # ebook-convert picks its input plugin from the file extension, so the markdown must go through a file
+        md_input = out_file.with_name(f"temp_{out_file.stem}.md")
+        md_input.write_bytes(_compose_html_markdown(subset).encode('utf-8'))
+        try:
+            subprocess.run(calibre_cmd(md_input, out_file), check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, encoding='utf-8', errors='replace')
+        finally:
+            md_input.unlink(missing_ok=True)
 
-        if config.html.template_file:
-            cmd.extend(["--template", config.html.template_file])
+    if config.azw3.direct_markdown:
+        # One calibre run per attempt instead of pandoc followed by calibre
+        try:
+            valid_summaries, error_messages = _render_dropping_failures(fixed_summaries, render_direct, azw3_file, config.pre_validate)
+            if valid_summaries:
+                return RenderResult(
+                    path=str(azw3_file),
+                    format="azw3",
+                    success=True,
+                    error=None if not error_messages else f"Skipped {len(error_messages)} summaries: " + "; ".join(error_messages[:3])
+                )
+            logger.warning("Direct markdown to AZW3 conversion failed for all summaries. Falling back to pandoc ePub conversion.")
+        except Exception as e:
+            logger.warning(f"Direct markdown to AZW3 conversion failed: {e}. Falling back to pandoc ePub conversion.")
 
-        subprocess.run(cmd, check=True, capture_output=True, text=True)
+    cmd = _pandoc_epub_cmd(config, title)
 
-        # Clean up temporary files
-        if config.html.css_inline:
-            temp_css = output_path / f"temp_{base_filename}.css"
-            temp_css.unlink(missing_ok=True)
-        if md_result.path and Path(md_result.path).exists():
-            Path(md_result.path).unlink(missing_ok=True)
+    def render_to(subset: List[str], out_file: Path, final: bool):
+        _run_pandoc([*cmd, *(_pandoc_rts_args(config) if final else []), "-o", str(out_file)], _compose_html_markdown(subset))
 
-        return RenderResult(
-            path=str(html_file),
-            format="html",
-            success=True,
-            error=None if not error_messages else f"Skipped {len(error_messages)} summaries: " + "; ".join(error_messages[:3])
-        )
-        
+    # First create ePub
+    try:
+        valid_summaries, error_messages = _render_dropping_failures(fixed_summaries, render_to, epub_file, config.pre_validate, discard_scratch=True)
     except Exception as e:
         return RenderResult(
             path="",
-            format="html",
+            format="azw3",
             success=False,
-            error=str(e)
+            error=_error_message(e)
         )
 
-def render_azw3(summaries: List[str], category, config: RendererConfig) -> RenderResult:
-    output_path = _ensure_output_dir(config.output_dir)
-    base_filename = _generate_base_filename(category, config)
-    azw3_file = output_path / f"{base_filename}.azw3"
-    epub_file = output_path / f"{base_filename}.epub"
-    
-    # Test each summary individually first
-    valid_summaries = []
-    error_messages = []
-    
-    for i, summary in enumerate(summaries):
-        try:
-            # Test render this single summary as ePub first
-            test_config = RendererConfig(
-                formats=["md"],
-                output_dir=str(output_path),
-                base_filename=f"_test_{i}",
-                md=config.md,
-                pdf=config.pdf,
-                html=config.html,
-                azw3=config.azw3
-            )
-            
-            test_md = render_md([summary], category, test_config)
-            if test_md.success:
-                # Test ePub conversion for this single summary
-                test_epub_file = output_path / f"_test_{i}.epub"
-                test_md_file = Path(test_md.path)
-                
-                content = test_md_file.read_text(encoding='utf-8')
-                content = re.sub(r'\n{3,}', r'\n\n', content)
-                content = content.replace("\\pagebreak","")
-                test_md_file.write_text(content, encoding='utf-8')
-                
-                cmd = [
-                    "pandoc",
-                    str(test_md_file),
-                    "-f", "gfm",
-                    "-t", "epub",
-                    "-o", str(test_epub_file),
-                    f"--highlight-style={config.html.highlight_style}",
-                    "--metadata", f"title={config.azw3.title or f'ArXiv Summaries - {category}'}",
-                    "--metadata", f"author={config.azw3.author}",
-                    "--metadata", f"lang={config.azw3.language}",
-                ]
-                
-                if config.azw3.description:
-                    cmd.extend(["--metadata", f"description={config.azw3.description}"])
-                
-                if config.azw3.cover_image and Path(config.azw3.cover_image).exists():
-                    cmd.extend(["--epub-cover-image", config.azw3.cover_image])
-                
-                subprocess.run(cmd, check=True, capture_output=True, text=True)
-                
-                # Test AZW3 conversion using calibre
-                test_azw3_file = output_path / f"_test_{i}.azw3"
-                
-                calibre_path = config.azw3.calibre_path or "ebook-convert"
-                calibre_cmd = [
-                    calibre_path,
-                    str(test_epub_file),
-                    str(test_azw3_file),
-                    "--title", config.azw3.title or f'ArXiv Summaries - {category}',
-                    "--authors", config.azw3.author,
-                    "--language", config.azw3.language
-                ]
-                
-                if config.azw3.description:
-                    calibre_cmd.extend(["--description", config.azw3.description])
-                
-                if config.azw3.cover_image and Path(config.azw3.cover_image).exists():
-                    calibre_cmd.extend(["--cover", config.azw3.cover_image])
-                
-                subprocess.run(calibre_cmd, check=True, capture_output=True, text=True)
-                
-                # Clean up test files
-                test_epub_file.unlink(missing_ok=True)
-                test_azw3_file.unlink(missing_ok=True)
-                test_md_file.unlink(missing_ok=True)
-                
-                valid_summaries.append(summary)
-            else:
-                error_messages.append(f"Summary {i+1}: {test_md.error}")
-                
-        except Exception as e:
-            error_messages.append(f"Summary {i+1}: {str(e)}")
-    
     if not valid_summaries:
         return RenderResult(
             path="",
@@ -551,100 +590,53 @@ def render_azw3(summaries: List[str], category, config: RendererConfig) -> Rende
             success=False,
             error="All summaries failed validation: " + "; ".join(error_messages)
         )
-    
-    # Render all valid summaries together
-    try:
-        md_result = render_md(valid_summaries, category, config)
-        if not md_result.success:
-            return RenderResult(
-                path="",
-                format="azw3",
-                success=False,
-                error=f"Failed to create intermediate markdown: {md_result.error}"
-            )
-        
-        md_file = Path(md_result.path)
-        content = md_file.read_text(encoding='utf-8')
-        content = re.sub(r'\n{3,}', r'\n\n', content)
-        content = content.replace("\\pagebreak","")
-        md_file.write_text(content, encoding='utf-8')
-
-        # First create ePub
-        cmd = [
-            "pandoc",
-            str(md_file),
-            "-f", "gfm",
-            "-t", "epub",
-            "-o", str(epub_file),
-            f"--highlight-style={config.html.highlight_style}",
-            "--metadata", f"title={config.azw3.title or f'ArXiv Summaries - {category}'}",
-            "--metadata", f"author={config.azw3.author}",
-            "--metadata", f"lang={config.azw3.language}",
-        ]
-
-        if config.azw3.description:
-            cmd.extend(["--metadata", f"description={config.azw3.description}"])
         
-        if config.azw3.cover_image and Path(config.azw3.cover_image).exists():
-            cmd.extend(["--epub-cover-image", config.azw3.cover_image])
-
-        subprocess.run(cmd, check=True, capture_output=True, text=True)
+    # Convert ePub to AZW3 using calibre's ebook-convert
+    try:
+        _write_atomically(azw3_file, lambda path: subprocess.run(calibre_cmd(epub_file, path), check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, encoding='utf-8', errors='replace'))
         
-        # Convert ePub to AZW3 using calibre's ebook-convert
-        try:
-            calibre_path = config.azw3.calibre_path or "ebook-convert"
-            calibre_cmd = [
-                calibre_path,
-                str(epub_file),
-                str(azw3_file),
-                "--title", config.azw3.title or f'ArXiv Summaries - {category}',
-                "--authors", config.azw3.author,
-                "--language", config.azw3.language
-            ]
+        # Clean up ePub file after successful conversion
+        if azw3_file.exists():
+            epub_file.unlink(missing_ok=True)
             
-            if config.azw3.description:
-                calibre_cmd.extend(["--description", config.azw3.description])
-            
-            if config.azw3.cover_image and Path(config.azw3.cover_image).exists():
-                calibre_cmd.extend(["--cover", config.azw3.cover_image])
-            
-            subprocess.run(calibre_cmd, check=True, capture_output=True, text=True)
-            
-            # Clean up ePub file after successful conversion
-            if azw3_file.exists():
-                epub_file.unlink(missing_ok=True)
-                
-        except (subprocess.CalledProcessError, FileNotFoundError):
-            # Fallback to ePub if calibre is not available
-            return RenderResult(
-                path=str(epub_file),
-                format="epub",
-                success=True,
-                error="calibre not available, created ePub instead of AZW3. Install calibre: sudo apt install calibre"
-            )
-
-        # Clean up temporary markdown
-        if md_result.path and Path(md_result.path).exists():
-            Path(md_result.path).unlink(missing_ok=True)
-
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        # Fallback to ePub if calibre is not available
         return RenderResult(
-            path=str(azw3_file),
-            format="azw3",
+            path=str(epub_file),
+            format="epub",
             success=True,
-            error=None if not error_messages else f"Skipped {len(error_messages)} summaries: " + "; ".join(error_messages[:3])
+            error="calibre not available, created ePub instead of AZW3. Install calibre: sudo apt install calibre"
         )
-        
-    except Exception as e:
+
+    return RenderResult(
+        path=str(azw3_file),
+        format="azw3",
+        success=True,
+        error=None if not error_messages else f"Skipped {len(error_messages)} summaries: " + "; ".join(error_messages[:3])
+    )
+
+def _render_format(format_name: str, fixed_summaries: List[str], category: str, config: RendererConfig, base_filename: str, output_path: Path) -> RenderResult:
+    """Render already-linted summaries to a single format."""
+    logger.info(f"Rendering format: {format_name}")
+    if format_name == "md":
+        return render_md(fixed_summaries, category, config, lint=False, base_filename=base_filename, output_path=output_path)
+    elif format_name == "pdf":
+        return render_pdf(fixed_summaries, category, config, lint=False, base_filename=base_filename, output_path=output_path)
+    elif format_name == "html":
+        return render_html(fixed_summaries, category, config, lint=False, base_filename=base_filename, output_path=output_path)
+    elif format_name == "azw3":
+        return render_azw3(fixed_summaries, category, config, lint=False, base_filename=base_filename, output_path=output_path)
+    else:
+        logger.error(f"Unsupported format requested: {format_name}",exc_info=True)
         return RenderResult(
             path="",
-            format="azw3",
+            format=format_name,
             success=False,
-            error=str(e)
+            error=f"Unsupported format: {format_name}"
         )
 
 def render(summaries: List[str], category: str, config: RendererConfig) -> List[RenderResult]:
     """Main entry point - delegates to format-specific renderers"""
-    results = []
     logger.info(f"Starting rendering for {len(summaries)} summaries in formats: {config.formats}")
 
     if not summaries:
@@ -657,30 +649,30 @@ def render(summaries: List[str], category: str, config: RendererConfig) -> List[
         )
         return [error_result]
 
-    # move "md" to end of config.formats
-    reordered_formats = [f for f in config.formats if f != "md"]
-    if "md" in config.formats:
-        reordered_formats.append("md")
-
-    for format_name in reordered_formats:
-        logger.info(f"Rendering format: {format_name}")
-        if format_name == "md":
-            result = render_md(summaries, category, config)
-        elif format_name == "pdf":
-            result = render_pdf(summaries, category, config)
-        elif format_name == "html":
-            result = render_html(summaries, category, config)
-        elif format_name == "azw3":
-            result = render_azw3(summaries, category, config)
-        else:
-            logger.error(f"Unsupported format requested: {format_name}",exc_info=True)
-            result = RenderResult(
-                path="",
-                format=format_name,
-                success=False,
-                error=f"Unsupported format: {format_name}"
-            )
-        results.append(result)
+    # Lint once and share the result; every format is built from the same in-memory markdown
+    fixed_summaries = _lint_summaries(summaries)
+    # Name all outputs once so every format shares the same date even across midnight
+    base_filename = _generate_base_filename(category, config)
+    output_path = _ensure_output_dir(config.output_dir)
+
+    # Each format shells out to its own pandoc/calibre processes, so formats render concurrently.
+    # Renderers only read the shared summaries; a format listed twice would write the same file, so render it once.
+    formats = list(dict.fromkeys(config.formats))
+    with ThreadPoolExecutor(max_workers=max(1, len(formats))) as executor:
+        futures = [executor.submit(_render_format, format_name, fixed_summaries, category, config, base_filename, output_path) for format_name in formats]
+        results = []
+        for format_name, future in zip(formats, futures):
+            # One format failing unexpectedly must not discard the formats that rendered
+            try:
+                results.append(future.result())
+            except Exception as e:
+                logger.error(f"Rendering format {format_name} failed: {e}", exc_info=True)
+                results.append(RenderResult(
+                    path="",
+                    format=format_name,
+                    success=False,
+                    error=str(e)
+                ))
     
     successful = sum(1 for r in results if r.success)
     logger.info(f"Rendering completed: {successful}/{len(results)} formats successful")
@@ -3,13 +3,16 @@ Summarize parsed papers using LLM
 """
 
 from dataclasses import dataclass
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Union
+import hashlib
+import json
 import logging
+from functools import cached_property
 
 try:
-    from client import BaseClient, BatchConfig, UsageInfo, count_tokens, truncate_to_tokens
+    from client import BaseClient, BatchConfig, UsageInfo, count_tokens, truncate_to_tokens, truncate_to_tokens_batch
 except:
-    from .client import BaseClient, BatchConfig, UsageInfo, count_tokens, truncate_to_tokens
+    from .client import BaseClient, BatchConfig, UsageInfo, count_tokens, truncate_to_tokens, truncate_to_tokens_batch
 
 logger = logging.getLogger(__name__)
 
@@ -31,27 +34,34 @@ class SummaryResult:
     success: bool
     error: Optional[str]=None
 
+@dataclass
+class FittedContent:
+    """Internal wrapper for paper text already truncated to the available context (see _fit_to_context)"""
+    text: str
+
 class SummarizerClient(BaseClient):
-    def __init__(self, config: SummarizerConfig, batch_config: Optional[BatchConfig]=None):
-        super().__init__(config, batch_config)
-        # estimate available context
+    @cached_property
+    def available_context(self) -> int:
+        """Tokens left for paper text, counted once per client on first use."""
         prompt_tokens = 0
-        if config.system_prompt:
-            prompt_tokens += count_tokens(config.system_prompt)
-        if config.user_prompt_template:
-            prompt_tokens += count_tokens(config.user_prompt_template)
+        if self.config.system_prompt:
+            prompt_tokens += count_tokens(self.config.system_prompt)
+        if self.config.user_prompt_template:
+            prompt_tokens += count_tokens(self.config.user_prompt_template)
         safety_margin = 128
-        output_tokens = config.completion_options.get('max_tokens', 8192)
-        base_context = config.context_length or 131072
-        self.available_context = base_context - prompt_tokens - output_tokens - safety_margin
+        output_tokens = self.config.completion_options.get('max_tokens', 8192)
+        base_context = self.config.context_length or 131072
+        return base_context - prompt_tokens - output_tokens - safety_margin
     
-    def _build_payload(self, parsed_content: str) -> dict:
+    def _build_payload(self, parsed_content: Union[FittedContent, str]) -> dict:
         """Build API payload for summarization request."""
-        # Truncate content if needed
-        token_count = count_tokens(parsed_content)
-        if token_count > self.available_context:
-            parsed_content = truncate_to_tokens(parsed_content, self.available_context)
-        
+        if isinstance(parsed_content, FittedContent):
+            return self._build_fitted_payload(parsed_content.text)
+        # Truncate content if needed; a single tokenizer pass at most, none when the content clearly fits
+        return self._build_fitted_payload(truncate_to_tokens(parsed_content, self.available_context))
+
+    def _build_fitted_payload(self, parsed_content: str) -> dict:
+        """Build API payload for content that already fits the available context."""
         messages = self._create_messages(parsed_content)
         
         base_payload = {
@@ -70,6 +80,10 @@ class SummarizerClient(BaseClient):
         
         return base_payload
     
+    def _fit_to_context(self, parsed_contents: List[str]) -> List[FittedContent]:
+        """Truncate all papers with one batched tokenizer call instead of one call per payload."""
+        return [FittedContent(content) for content in truncate_to_tokens_batch(parsed_contents, self.available_context)]
+
     def _parse_response(self, response_content: str) -> str:
         return response_content.strip()
     
@@ -96,41 +110,51 @@ class SummarizerClient(BaseClient):
         messages.append({"role": "user", "content": user_content})
         return messages
 
+def summary_cache_key(parsed_content: str, config: SummarizerConfig) -> str:
+    """Hash of the paper content and every setting that shapes its summary, for caching summaries across runs."""
+    key = hashlib.sha256()
+    for part in (
+        config.provider,
+        config.model,
+        config.system_prompt or "",
+        config.user_prompt_template or "",
+        json.dumps(config.completion_options, sort_keys=True),
+        str(config.context_length),
+        parsed_content,
+    ):
+        key.update(part.encode('utf-8'))
+        key.update(b'\0')
+    return key.hexdigest()
+
 def summarize(parsed_contents: List[str], config: SummarizerConfig, batch_config: Optional[BatchConfig] = None) -> List[SummaryResult]:
     """Summarize multiple papers using batch processing when possible."""
     logger.info(f"Starting summarization for {len(parsed_contents)} papers (batch={getattr(config, 'batch', False)})")
     if not getattr(config, 'batch', False):
-        # If batch is disabled, process sequentially
+        # If batch is disabled, send individual requests; they are network-bound, so run them concurrently up to the configured limit
         client = SummarizerClient(config, batch_config)
-        results = []
-        for content in parsed_contents:
-            result, usage_info = client.process_single(content, sleep_time=10, return_usage=True)
-            results.append(result)
+        final_results = []
+        for result, usage_info in client.process_concurrent(parsed_contents, return_usage=True):
+            final_results.append(SummaryResult(
+                content=result or "",
+                success=result is not None,
+                error=None if result is not None else "Single processing failed for this item"
+            ))
             if usage_info and (usage_info.prompt_tokens > 0 or usage_info.completion_tokens > 0):
                 logger.info(f"Summarized paper with {usage_info}")
             else:
                 logger.info(f"Summarized paper with {client.config.model} (usage info unavailable)")
 
-        final_results = [
-            SummaryResult(
-                content=result or "",
-                success=result is not None,
-                error=None if result is not None else "Single processing failed for this item"
-            ) for result in results
-        ]
         logger.info(f"Single summarization completed: {len([r for r in final_results if r.success])} successful")
         return final_results
     
     try:
         client = SummarizerClient(config, batch_config)
-        results = client.process_batch(parsed_contents)
-        
         final_results = [
             SummaryResult(
                 content=result or "",
                 success=result is not None,
                 error=None if result is not None else "Batch processing failed for this item",
-            ) for result in results
+            ) for result in client.process_batch(client._fit_to_context(parsed_contents))
         ]
         logger.info(f"Batch summarization completed: {len([r for r in final_results if r.success])} successful")
         return final_results
@@ -0,0 +1,28 @@
+from autosumm.pipeline.cache import Cacher, CacherConfig
+
+
+def make_cacher(tmp_path):
+    return Cacher(CacherConfig(dir=str(tmp_path), ttl_days=16))
+
+
+def test_rate_config_change_keeps_summaries(tmp_path):
+    cacher = make_cacher(tmp_path)
+    cacher.detect_and_handle_config_changes({"strategy": "llm", "top_k": 100})
+    cacher.store_similarity_score("2401.00001", 0.5)
+    cacher.store_summary("content-hash", "A summary")
+
+    cacher.detect_and_handle_config_changes({"strategy": "hybrid", "top_k": 50})
+
+    assert cacher.get_similarity_score("2401.00001") is None
+    assert cacher.get_summary("content-hash") == "A summary"
+
+
+def test_clear_all_cache_can_include_summaries(tmp_path):
+    cacher = make_cacher(tmp_path)
+    cacher.store_summary("content-hash", "A summary")
+
+    cacher.clear_all_cache()
+    assert cacher.get_summary("content-hash") == "A summary"
+
+    cacher.clear_all_cache(include_summaries=True)
+    assert cacher.get_summary("content-hash") is None
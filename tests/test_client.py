@@ -0,0 +1,24 @@
+import json
+import sys
+
+import pytest
+
+from autosumm.pipeline.client import json_loads
+
+client_module = sys.modules["autosumm.pipeline.client"]
+
+DOCUMENT = '{"id": "x", "scores": [1, 2.5], "nested": {"ok": true, "none": null}}'
+
+
+@pytest.mark.parametrize("backend", ["json", "orjson"])
+def test_json_loads_backends_agree(backend, monkeypatch):
+    if backend == "orjson":
+        pytest.importorskip("orjson")
+        assert client_module.orjson is not None
+    else:
+        monkeypatch.setattr(client_module, "orjson", None)
+
+    assert json_loads(DOCUMENT) == json.loads(DOCUMENT)
+    assert json_loads(DOCUMENT.encode()) == json.loads(DOCUMENT)
+    with pytest.raises(json.JSONDecodeError):
+        json_loads("{not json")
@@ -0,0 +1,201 @@
+import json
+import sqlite3
+import sys
+
+import numpy as np
+import pytest
+import requests
+
+from autosumm.pipeline.client import BatchConfig
+from autosumm.pipeline.rate import EMBEDDING_DTYPE, RaterConfig, RaterEmbedderClient, RaterEmbedderConfig, RaterLLMClient, RaterLLMConfig, rate_embed
+
+
+class FakeEmbedderClient(RaterEmbedderClient):
+    """Embedder client whose requests are answered locally; rejects requests larger than max_inputs with reject_status."""
+
+    def __init__(self, max_inputs=10, reject_status=400):
+        self.config = RaterEmbedderConfig(provider="openai", api_key="key", base_url="http://embed.test/v1", model="m", cache_dir=None, batch_size=64)
+        self.batch_config = BatchConfig()
+        self.embed_cache_db = None
+        self.max_inputs = max_inputs
+        self.reject_status = reject_status
+        self.request_sizes = []
+
+    def _make_sync_request(self, payload):
+        inputs = payload["input"]
+        self.request_sizes.append(len(inputs))
+        if len(inputs) > self.max_inputs:
+            response = requests.Response()
+            response.status_code = self.reject_status
+            raise requests.HTTPError(f"HTTP {self.reject_status}", response=response)
+        return {"data": [{"index": i, "embedding": [1.0, 0.0]} for i in range(len(inputs))]}, None
+
+
+def test_oversized_embedding_batch_is_split():
+    client = FakeEmbedderClient(max_inputs=10, reject_status=400)
+    embeddings = client.get_embeddings([f"text {i}" for i in range(40)])
+    assert all(embedding is not None for embedding in embeddings)
+    assert max(client.request_sizes[1:]) <= 20
+
+
+def test_auth_error_fails_without_splitting():
+    client = FakeEmbedderClient(max_inputs=0, reject_status=401)
+    embeddings = client.get_embeddings([f"text {i}" for i in range(40)])
+    assert embeddings == [None] * 40
+    assert client.request_sizes == [40]
+
+
+def test_empty_query_embedding_fails_each_paper(monkeypatch):
+    monkeypatch.setattr(RaterEmbedderClient, "_compute_query_embedding", lambda self: np.zeros(0, dtype=np.float32))
+    embedder = RaterEmbedderConfig(provider="openai", api_key="key", base_url="http://empty-query.test/v1", model="m", cache_dir=None)
+    config = RaterConfig(strategy="embedder", top_k=10, max_selected=5, embedder=embedder, llm=None)
+
+    results = rate_embed(["first paper", "second paper"], config)
+
+    assert [result.success for result in results] == [False, False]
+    assert all("Query embedding unavailable" in result.error for result in results)
+
+
+def test_llm_score_matches_exact_weighted_average():
+    criteria = {
+        "novelty": {"description": "new ideas", "weight": 0.1},
+        "clarity": {"description": "clear writing", "weight": 0.7},
+        "impact": {"description": "likely impact", "weight": 0.2},
+    }
+    config = RaterLLMConfig(
+        provider="openai", api_key="key", base_url="http://rate.test/v1", model="m", batch=False,
+        system_prompt=None, user_prompt_template="{criteria_text}\n{paper_text}", completion_options={},
+        context_length=4096, criteria=criteria,
+    )
+    client = RaterLLMClient(config)
+    response = '{"novelty": {"score": 7.3}, "clarity": {"score": "8.9"}, "impact": {"score": 6.1}}'
+    expected = (0.1 * 7.3 + 0.7 * 8.9 + 0.2 * 6.1) / (0.1 + 0.7 + 0.2)
+    assert client._parse_response(response) == pytest.approx(expected, rel=1e-12)
+
+
+class _TrackedConnection:
+    """sqlite3 connection stand-in that fails every statement and records whether it was closed."""
+
+    def __init__(self):
+        self.closed = False
+
+    def cursor(self):
+        return self
+
+    def execute(self, *args):
+        raise sqlite3.OperationalError("database is locked")
+
+    executemany = execute
+
+    def close(self):
+        self.closed = True
+
+
+def test_embed_cache_round_trip(tmp_path):
+    client = FakeEmbedderClient()
+    client.config.cache_dir = str(tmp_path)
+    client.embed_cache_db = client._embed_cache_db()
+    client._embed_cache_put({"a": np.array([0.5, 1.0])})
+    found = client._embed_cache_get(["a", "b"])
+    assert list(found) == ["a"]
+    assert found["a"].tolist() == [0.5, 1.0]
+
+
+def test_embed_cache_closes_connection_on_error(tmp_path, monkeypatch):
+    client = FakeEmbedderClient()
+    client.embed_cache_db = tmp_path / "embeddings.db"
+    connections = []
+
+    def connect(path):
+        connections.append(_TrackedConnection())
+        return connections[-1]
+
+    monkeypatch.setattr(sqlite3, "connect", connect)
+    assert client._embed_cache_get(["a"]) == {}
+    client._embed_cache_put({"a": np.array([0.5, 1.0])})
+    assert len(connections) == 2
+    assert all(connection.closed for connection in connections)
+
+
+def _reference_similarities(query_unit, embeddings):
+    matrix = np.asarray(embeddings, dtype=np.float64)
+    return (matrix / np.linalg.norm(matrix, axis=1, keepdims=True)) @ query_unit
+
+
+@pytest.fixture
+def similarity_inputs():
+    rng = np.random.default_rng(0)
+    query = rng.standard_normal(64)
+    query_unit = (query / np.linalg.norm(query)).astype(np.float32)
+    embeddings = [rng.standard_normal(64).astype(EMBEDDING_DTYPE) for _ in range(5)]
+    return query_unit, embeddings
+
+
+@pytest.mark.parametrize("backend", ["numpy", "numba", "simsimd"])
+def test_cosine_similarities_backends_agree(backend, similarity_inputs, monkeypatch):
+    rate_module = sys.modules["autosumm.pipeline.rate"]
+    if backend == "simsimd":
+        pytest.importorskip("simsimd")
+        assert rate_module.simsimd is not None
+    else:
+        monkeypatch.setattr(rate_module, "simsimd", None)
+    if backend == "numba":
+        pytest.importorskip("numba")
+        assert rate_module._cosine_kernel is not None
+    elif backend == "numpy":
+        monkeypatch.setattr(rate_module, "_cosine_kernel", None)
+
+    query_unit, embeddings = similarity_inputs
+    similarities = rate_module.cosine_similarities(query_unit, embeddings)
+    assert similarities.shape == (len(embeddings),)
+    np.testing.assert_allclose(similarities, _reference_similarities(query_unit, embeddings), atol=1e-5)
+
+
+class _StreamedResponse:
+    def __init__(self, events):
+        self.lines = [line.encode() for line in events]
+
+    def iter_lines(self):
+        return iter(self.lines)
+
+
+def _llm_client(provider):
+    config = RaterLLMConfig(
+        provider=provider, api_key="key", base_url="http://rate.test", model="m", batch=False,
+        system_prompt=None, user_prompt_template="{criteria_text}\n{paper_text}", completion_options={},
+        context_length=4096, criteria={"novelty": {"description": "new ideas", "weight": 1.0}},
+    )
+    return RaterLLMClient(config)
+
+
+def _sse(payload):
+    return "data: " + json.dumps(payload)
+
+
+RATINGS = ['{"novelty": ', '{"score": 8}}', '\n\nThe paper is novel.']
+
+
+def test_openai_stream_keeps_usage_after_ratings_close():
+    events = [_sse({"choices": [{"delta": {"content": text}}]}) for text in RATINGS]
+    events += [_sse({"choices": [], "usage": {"prompt_tokens": 120, "completion_tokens": 15, "total_tokens": 135}}), "data: [DONE]"]
+    response = _StreamedResponse(events)
+    content, usage_info = _llm_client("openai")._handle_openai_response(response, is_streaming=True)
+    assert content == '{"novelty": {"score": 8}}'
+    assert (usage_info.prompt_tokens, usage_info.completion_tokens, usage_info.total_tokens) == (120, 15, 135)
+
+
+def test_anthropic_stream_keeps_usage_after_ratings_close():
+    events = [_sse({"type": "message_start", "message": {"usage": {"input_tokens": 120}}})]
+    events += [_sse({"type": "content_block_delta", "delta": {"text": text}}) for text in RATINGS]
+    events += [_sse({"type": "message_delta", "usage": {"output_tokens": 15}}), _sse({"type": "message_stop"})]
+    content, usage_info = _llm_client("anthropic")._handle_anthropic_response(_StreamedResponse(events), is_streaming=True)
+    assert content == '{"novelty": {"score": 8}}'
+    assert (usage_info.prompt_tokens, usage_info.completion_tokens, usage_info.total_tokens) == (120, 15, 135)
+
+
+def test_ollama_stream_keeps_usage_after_ratings_close():
+    events = [json.dumps({"message": {"content": text}, "done": False}) for text in RATINGS]
+    events += [json.dumps({"message": {"content": ""}, "done": True, "prompt_eval_count": 120, "eval_count": 15})]
+    content, usage_info = _llm_client("ollama")._handle_ollama_response(_StreamedResponse(events), is_streaming=True)
+    assert content == '{"novelty": {"score": 8}}'
+    assert (usage_info.prompt_tokens, usage_info.completion_tokens, usage_info.total_tokens) == (120, 15, 135)
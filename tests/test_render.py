@@ -0,0 +1,21 @@
+import sys
+
+from autosumm.pipeline.render import PDFRendererConfig, RendererConfig
+
+render_module = sys.modules["autosumm.pipeline.render"]
+
+
+def _variables(cmd):
+    return {cmd[i + 1] for i, arg in enumerate(cmd) if arg == "--variable"}
+
+
+def test_pdf_command_passes_list_spacing():
+    config = RendererConfig(pdf=PDFRendererConfig(list_item_sep="2pt", list_par_sep="1pt", list_top_sep="4pt"))
+    variables = _variables(render_module._pandoc_pdf_cmd(config))
+    assert {"itemsep=2pt", "parsep=1pt", "topsep=4pt"} <= variables
+
+
+def test_pdf_command_defaults():
+    cmd = render_module._pandoc_pdf_cmd(RendererConfig())
+    assert cmd[0] == "pandoc"
+    assert {"itemsep=0pt", "parsep=0pt", "topsep=6pt", "colorlinks=true"} <= _variables(cmd)
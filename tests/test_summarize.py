@@ -0,0 +1,36 @@
+import sys
+
+from autosumm.pipeline.summarize import FittedContent, SummarizerClient, SummarizerConfig
+
+summarize_module = sys.modules["autosumm.pipeline.summarize"]
+
+
+def make_client():
+    config = SummarizerConfig(
+        provider="openai", api_key="key", base_url="http://summarize.test/v1", model="m",
+        batch=True, system_prompt=None, user_prompt_template=None, completion_options={}, context_length=4096,
+    )
+    return SummarizerClient(config)
+
+
+def test_fitted_content_skips_truncation(monkeypatch):
+    client = make_client()
+    monkeypatch.setattr(client.__class__, "available_context", 3)
+    monkeypatch.setattr(summarize_module, "truncate_to_tokens_batch", lambda texts, max_tokens: [text[:3] for text in texts])
+    fitted = client._fit_to_context(["abcdef"])
+    assert fitted == [FittedContent("abc")]
+
+    def fail_truncate(text, max_tokens):
+        raise AssertionError("fitted content must not be truncated again")
+
+    monkeypatch.setattr(summarize_module, "truncate_to_tokens", fail_truncate)
+    payload = client._build_payload(fitted[0])
+    assert payload["messages"][-1]["content"] == "abc"
+
+
+def test_plain_content_is_truncated(monkeypatch):
+    client = make_client()
+    monkeypatch.setattr(client.__class__, "available_context", 3)
+    monkeypatch.setattr(summarize_module, "truncate_to_tokens", lambda text, max_tokens: text[:max_tokens])
+    payload = client._build_payload("abcdef")
+    assert payload["messages"][-1]["content"] == "abc"